@@ -0,0 +1,164 @@
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+
+ADVANCED_RESULTS_DIR = Path('results') / 'advanced'
+ANALYSIS_VERSION = '2.1'
+BLOCK_ALIGNMENT = 64  # Bytes; keeps every block aligned for any dtype
+
+def _split_arrays(value, arrays: list):
+    """
+    Replace NumPy arrays in a nested structure by block references.
+
+    Arrays are appended to `arrays`; everything else is converted to plain
+    JSON types. Object arrays hold pointers, not data, so they are stored
+    in the JSON as nested lists instead.
+    """
+    if isinstance(value, np.ndarray) and value.dtype.hasobject:
+        return _split_arrays(value.tolist(), arrays)
+    if isinstance(value, np.ndarray):
+        arrays.append(np.ascontiguousarray(value))
+        return {'__block__': len(arrays) - 1}
+    if isinstance(value, dict):
+        return {str(k): _split_arrays(v, arrays) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_split_arrays(v, arrays) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def _join_arrays(value, blocks: list):
+    """Inverse of _split_arrays, with blocks given as (lazy) arrays."""
+    if isinstance(value, dict):
+        if '__block__' in value:
+            return blocks[value['__block__']]
+        return {k: _join_arrays(v, blocks) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_join_arrays(v, blocks) for v in value]
+    return value
+
+def _arrays_file(video_dir: Path):
+    """Arrays file referenced by the current metadata, or None."""
+    try:
+        with open(video_dir / 'metadata.json', 'r') as f:
+            return json.load(f).get('arrays_file', 'arrays.bin')
+    except FileNotFoundError:
+        return None
+
+def save_analysis(video_id: str, analysis_results: dict, root=ADVANCED_RESULTS_DIR) -> Path:
+    """
+    Store the advanced analysis of one video.
+
+    Scalars and small nested structures go to metadata.json; every NumPy
+    array is written as a typed binary block to a new arrays file, described
+    by dtype, shape and offset in the metadata so it can be memory-mapped.
+    Renaming metadata.json into place is the commit: readers see either the
+    old metadata with the old arrays file or the new pair.
+
+    Args:
+        video_id (str): Video identifier (folder name)
+        analysis_results (dict): Nested analysis results
+        root (Path): Store directory
+
+    Returns:
+        Path: Folder of the stored video
+    """
+    video_dir = Path(root) / video_id
+    video_dir.mkdir(parents=True, exist_ok=True)
+
+    arrays = []
+    metadata = _split_arrays(analysis_results, arrays)
+
+    previous_arrays = _arrays_file(video_dir)
+    arrays_file = f'arrays.{time.time_ns()}.bin'
+
+    blocks = []
+    offset = 0
+    with open(video_dir / arrays_file, 'wb') as f:
+        for array in arrays:
+            padding = -offset % BLOCK_ALIGNMENT
+            f.write(b'\0' * padding)
+            offset += padding
+            f.write(array.tobytes())
+            blocks.append({
+                'dtype': array.dtype.str,
+                'shape': list(array.shape),
+                'offset': offset
+            })
+            offset += array.nbytes
+
+    metadata_tmp = video_dir / 'metadata.json.tmp'
+    with open(metadata_tmp, 'w') as f:
+        json.dump({
+            'results': metadata,
+            'arrays_file': arrays_file,
+            'blocks': blocks,
+            'metadata': {
+                'analysis_version': ANALYSIS_VERSION,
+                'timestamp': datetime.now().isoformat()
+            }
+        }, f, indent=2)
+    metadata_tmp.replace(video_dir / 'metadata.json')
+
+    # Keep the previous arrays file for readers that loaded the old
+    # metadata just before the rename; anything older is unreferenced
+    for path in video_dir.glob('arrays*.bin'):
+        if path.name not in (arrays_file, previous_arrays):
+            path.unlink()
+    return video_dir
+
+def load_analysis(video_id: str, root=ADVANCED_RESULTS_DIR) -> dict:
+    """
+    Load the advanced analysis of one video.
+
+    Arrays come back as read-only memory maps, so a series is only read
+    from disk when it is actually used.
+
+    Args:
+        video_id (str): Video identifier
+        root (Path): Store directory
+
+    Returns:
+        dict: Nested analysis results
+    """
+    video_dir = Path(root) / video_id
+    with open(video_dir / 'metadata.json', 'r') as f:
+        stored = json.load(f)
+
+    arrays_path = video_dir / stored.get('arrays_file', 'arrays.bin')
+    blocks = []
+    for block in stored['blocks']:
+        dtype = np.dtype(block['dtype'])
+        shape = tuple(block['shape'])
+        if dtype.itemsize * int(np.prod(shape)) == 0:
+            # np.memmap cannot map zero bytes
+            blocks.append(np.empty(shape, dtype=dtype))
+        else:
+            blocks.append(np.memmap(arrays_path, dtype=dtype, mode='r',
+                                    offset=block['offset'], shape=shape))
+    return _join_arrays(stored['results'], blocks)
+
+def list_analyses(root=ADVANCED_RESULTS_DIR) -> list:
+    """Video IDs with a stored advanced analysis."""
+    root = Path(root)
+    if not root.exists():
+        return []
+    return sorted(p.parent.name for p in root.glob('*/metadata.json'))
+
+def scalar_features(root=ADVANCED_RESULTS_DIR) -> list:
+    """
+    Scalar audio features of every stored video, read from the metadata only.
+
+    Returns:
+        list: One dict per video with video_id and its scalar features
+    """
+    rows = []
+    for video_id in list_analyses(root):
+        with open(Path(root) / video_id / 'metadata.json', 'r') as f:
+            features = json.load(f)['results'].get('features', {})
+        row = {'video_id': video_id}
+        row.update({k: v for k, v in features.items() if isinstance(v, (int, float))})
+        rows.append(row)
+    return rows
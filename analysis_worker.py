@@ -0,0 +1,93 @@
+import argparse
+import json
+import sys
+from audio_analyzer import analyze_audio
+from shared_audio import analyze_files_parallel
+from video_processor import cleanup_files
+
+def main():
+    """
+    Analysis-only worker: extract features from local audio files.
+
+    Reads "url<TAB>path" or "path" lines from stdin (the output of
+    download_worker.py) or paths from the command line, and prints one JSON
+    record per file. Does not import the download stack.
+    """
+    parser = argparse.ArgumentParser(description="Analyze downloaded audio files")
+    parser.add_argument('paths', nargs='*', help="Audio files (default: read from stdin)")
+    parser.add_argument('--streaming', action='store_true', help="Analyze full tracks block by block")
+    parser.add_argument('--melodic', action='store_true', help="Add pitch statistics")
+    parser.add_argument('--fast-tempo', action='store_true', help="Estimate tempo without beat tracking")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Analysis processes (decoded audio is shared, not copied)")
+    parser.add_argument('--keep', action='store_true', help="Keep audio files after analysis")
+    args = parser.parse_args()
+
+    lines = args.paths or (line.strip() for line in sys.stdin)
+    tempo_mode = 'fast' if args.fast_tempo else 'beat_track'
+    if args.workers > 1 and not args.streaming:
+        results = _analyze_parallel(lines, args.workers, args.melodic, tempo_mode)
+    else:
+        results = _analyze_sequential(lines, args.melodic, args.streaming, tempo_mode)
+
+    failed = 0
+    while True:
+        # Progress goes to stderr so stdout only carries the JSON records
+        sys.stdout, stdout = sys.stderr, sys.stdout
+        try:
+            url, path, features = next(results)
+            if not args.keep:
+                cleanup_files(path)
+        except StopIteration:
+            break
+        finally:
+            sys.stdout = stdout
+        if isinstance(features, Exception):
+            failed += 1
+            continue
+        features['url'] = url or None
+        features['path'] = path
+        print(json.dumps(features), flush=True)
+    sys.exit(1 if failed else 0)
+
+def _split_line(line: str):
+    url, _, path = line.rpartition('\t')
+    return url, path
+
+def _analyze_sequential(lines, include_melodic: bool, streaming: bool, tempo_mode: str):
+    """Yield (url, path, features or exception) for each input line, in this process."""
+    for line in lines:
+        if not line:
+            continue
+        url, path = _split_line(line)
+        try:
+            features = analyze_audio(path, include_melodic=include_melodic, streaming=streaming,
+                                     tempo_mode=tempo_mode)
+        except Exception as e:
+            features = e
+        yield url, path, features
+
+def _quiet_worker():
+    """Pool initializer: keep analysis progress off the JSON output."""
+    sys.stdout = sys.stderr
+
+def _analyze_parallel(lines, workers: int, include_melodic: bool, tempo_mode: str):
+    """
+    Yield (url, path, features or exception) in completion order. Files
+    are decoded here and handed to the workers through shared memory.
+    """
+    urls = {}
+
+    def paths():
+        for line in lines:
+            if line:
+                url, path = _split_line(line)
+                urls[path] = url
+                yield path
+
+    for path, features in analyze_files_parallel(paths(), workers, include_melodic, tempo_mode,
+                                                 initializer=_quiet_worker):
+        yield urls.pop(path), path, features
+
+if __name__ == "__main__":
+    main()
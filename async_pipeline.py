@@ -0,0 +1,251 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from audio_analyzer import analyze_audio, analysis_mode
+from data_reader import extract_video_id
+from feature_stats import FeatureStatistics
+from result_table import ResultTable
+from fingerprint import fingerprint_file, audio_duration, reused_features
+from shared_audio import (SharedAudio, publish_audio, release_audio, attach_audio, analyze_shared_audio,
+                          fingerprint_shared_audio)
+from video_processor import fetch_audio, is_permanent_failure, wav_conversion_command, cleanup_files, DOWNLOADS_DIR
+
+async def convert_to_wav_async(input_path: str) -> str:
+    """
+    Convert audio file to WAV format with an ffmpeg asyncio subprocess.
+
+    The input file is always removed. If the task is cancelled, ffmpeg is
+    killed and the partial output is removed as well.
+
+    Returns:
+        str: Path of the WAV file (raises RuntimeError if ffmpeg fails)
+    """
+    output_path = str(Path(input_path).with_suffix('.wav'))
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *wav_conversion_command(input_path, output_path),
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            cleanup_files(output_path)
+            raise
+    finally:
+        cleanup_files(input_path)
+
+    if process.returncode != 0:
+        cleanup_files(output_path)
+        raise RuntimeError(f"ffmpeg failed: {stderr.decode(errors='replace').strip()[-500:]}")
+    return output_path
+
+def _discard_download(job) -> None:
+    """Remove the file of a download whose task was cancelled."""
+    if not job.cancelled() and job.exception() is None:
+        cleanup_files(job.result())
+
+def _release_published(job) -> None:
+    """Free the segment of a decode whose task was cancelled."""
+    if not job.cancelled() and job.exception() is None:
+        release_audio(job.result())
+
+class AsyncPipeline:
+    """
+    Download, convert and analyze many videos from one coordinator process.
+
+    yt-dlp runs in a thread pool, ffmpeg as asyncio subprocesses and the
+    CPU-bound analysis in a process pool, which receives decoded audio
+    through shared memory. Each stage has its own
+    concurrency limit, so hundreds of downloads can be in flight while
+    conversion and analysis stay matched to the number of cores.
+    """
+
+    def __init__(self, fingerprints=None, max_downloads: int = 64, max_conversions: int = None,
+                 max_analyses: int = None, max_retries: int = 3,
+                 downloads_dir: str = DOWNLOADS_DIR, streaming: bool = False,
+                 tempo_mode: str = 'beat_track', include_melodic: bool = False, failure_cache=None,
+                 audio_cache=None):
+        cpu_count = os.cpu_count() or 1
+        self.fingerprints = fingerprints
+        self.max_downloads = max_downloads
+        self.max_conversions = max_conversions or cpu_count
+        self.max_analyses = max_analyses or cpu_count
+        self.max_retries = max_retries
+        self.downloads_dir = downloads_dir
+        self.streaming = streaming
+        self.tempo_mode = tempo_mode
+        self.include_melodic = include_melodic
+        self.mode = analysis_mode(include_melodic, streaming, tempo_mode)
+        self.failure_cache = failure_cache
+        # Streaming never holds the decoded window, so there is nothing to cache
+        self.audio_cache = None if streaming else audio_cache
+        self.results = ResultTable()
+        self.feature_stats = FeatureStatistics()
+        self.stats = {'videos': 0, 'successful': 0, 'failed': 0, 'duplicates': 0, 'skipped': 0}
+
+    async def download(self, url: str) -> str:
+        """
+        Download with retries and exponential backoff.
+        
+        Permanent failures (see is_permanent_failure) are raised at once
+        and recorded in the failure cache.
+        """
+        for attempt in range(self.max_retries):
+            try:
+                async with self._download_slots:
+                    job = self._threads.submit(fetch_audio, url, self.downloads_dir)
+                    try:
+                        return await asyncio.wrap_future(job)
+                    except asyncio.CancelledError:
+                        # A running yt-dlp call cannot be interrupted, so drop
+                        # its file once it finishes
+                        job.add_done_callback(_discard_download)
+                        raise
+            except Exception as e:
+                if is_permanent_failure(e):
+                    if self.failure_cache is not None:
+                        self.failure_cache.add(url, str(e))
+                    raise
+                if attempt == self.max_retries - 1:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+    async def convert(self, audio_path: str) -> str:
+        async with self._conversion_slots:
+            return await convert_to_wav_async(audio_path)
+
+    async def publish(self, wav_path: str) -> SharedAudio:
+        """Decode the analysis window into shared memory in a thread."""
+        job = self._threads.submit(publish_audio, wav_path)
+        try:
+            return await asyncio.wrap_future(job)
+        except asyncio.CancelledError:
+            # Decoding cannot be interrupted, so free the segment once it exists
+            job.add_done_callback(_release_published)
+            raise
+
+    async def analyze(self, url: str, wav_path: str):
+        """
+        Fingerprint and analyze a WAV file in the process pool.
+
+        Outside streaming mode the file is decoded once into a shared
+        memory segment, and both worker jobs attach to it instead of
+        decoding the file again or receiving pickled audio. The window of
+        a newly analyzed video is also stored in the audio cache, if any.
+
+        Returns:
+            tuple: (features dict, True if reused from a duplicate)
+        """
+        loop = asyncio.get_running_loop()
+        async with self._analysis_slots:
+            handle = None
+            if self.streaming:
+                # Streaming reads the file block by block; nothing to hand off
+                duration = audio_duration(wav_path)
+                fingerprint_job = functools.partial(fingerprint_file, wav_path)
+                analysis_job = functools.partial(
+                    analyze_audio, wav_path, include_melodic=self.include_melodic,
+                    streaming=True, tempo_mode=self.tempo_mode
+                )
+            else:
+                handle = await self.publish(wav_path)
+                duration = handle.duration
+                fingerprint_job = functools.partial(fingerprint_shared_audio, handle)
+                analysis_job = functools.partial(
+                    analyze_shared_audio, handle, include_melodic=self.include_melodic,
+                    tempo_mode=self.tempo_mode
+                )
+            try:
+                if self.fingerprints is None:
+                    fingerprint = None
+                else:
+                    fingerprint = await loop.run_in_executor(self._processes, fingerprint_job)
+                    match = self.fingerprints.match(fingerprint, duration, self.mode, exclude=url)
+                    if match:
+                        return reused_features(match, url), True
+
+                features = await loop.run_in_executor(self._processes, analysis_job)
+                if self.audio_cache is not None:
+                    with attach_audio(handle) as y:
+                        self.audio_cache.put(extract_video_id(url), y, handle.sr, duration, url)
+            finally:
+                if handle is not None:
+                    release_audio(handle)
+        if fingerprint is not None:
+            self.fingerprints.add(url, fingerprint, dict(features), duration, self.mode)
+        return features, False
+
+    async def process(self, url: str, views):
+        """
+        Run one video through all stages and append its features to
+        self.results; returns None on failure.
+        """
+        if self.failure_cache is not None and url in self.failure_cache:
+            self.stats['skipped'] += 1
+            print(f"- Skipping known unavailable video {url}")
+            return None
+        wav_path = None
+        try:
+            audio_path = await self.download(url)
+            wav_path = await self.convert(audio_path)
+            features, duplicate = await self.analyze(url, wav_path)
+        except Exception as e:
+            self.stats['failed'] += 1
+            print(f"✗ Error processing {url}: {str(e)}")
+            return None
+        finally:
+            cleanup_files(wav_path)
+
+        features['url'] = url
+        features['views'] = views
+        self.results.append(features)
+        self.feature_stats.update(features)
+        self.stats['successful'] += 1
+        if duplicate:
+            self.stats['duplicates'] += 1
+        print(f"✓ Processed {url}")
+        return features
+
+    async def run(self, rows) -> ResultTable:
+        """
+        Process (url, views) rows concurrently.
+
+        Cancelling the run cancels every in-flight video: pending executor
+        jobs are dropped, ffmpeg processes are killed and temporary files
+        are removed.
+
+        Returns:
+            ResultTable: self.results, the features of the successful videos
+            in completion order
+        """
+        rows = list(rows)
+        self.stats['videos'] += len(rows)
+        self._download_slots = asyncio.Semaphore(self.max_downloads)
+        self._conversion_slots = asyncio.Semaphore(self.max_conversions)
+        self._analysis_slots = asyncio.Semaphore(self.max_analyses)
+        self._threads = ThreadPoolExecutor(max_workers=self.max_downloads)
+        # Workers must not be forked from this process while download threads
+        # hold locks, so they start from a clean forkserver process
+        self._processes = ProcessPoolExecutor(max_workers=self.max_analyses,
+                                              mp_context=multiprocessing.get_context('forkserver'))
+
+        tasks = [asyncio.create_task(self.process(url, views)) for url, views in rows]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            raise
+        self._threads.shutdown()
+        self._processes.shutdown()
+        return self.results
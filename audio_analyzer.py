@@ -1,69 +1,343 @@
-import librosa
 import numpy as np
-import soundfile as sf
-import os
 import gc
+from lazy_imports import lazy_import
+from video_processor import analyze_melodic_content, MELODY_SR
 
-def analyze_audio(audio_path: str) -> dict:
+librosa = lazy_import('librosa')
+
+MAX_DURATION = 60  # seconds analyzed in the default (in-memory) mode
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+
+TEMPO_HOP = 1024   # ~21.5 onset frames per second at 22.05 kHz
+TEMPO_MIN_BPM = 40
+TEMPO_MAX_BPM = 240
+TEMPO_PRIOR_BPM = 120  # Same log-normal prior as librosa's beat tracker
+
+def tempo_from_onset_envelope(onset_env: np.ndarray, frame_rate: float) -> float:
+    """
+    Tempo from the autocorrelation of an onset strength envelope.
+    
+    The autocorrelation is computed with one FFT, weighted by a log-normal
+    prior around TEMPO_PRIOR_BPM, and the peak lag is refined by parabolic
+    interpolation.
+    
+    Args:
+        onset_env (np.ndarray): Onset strength per frame
+        frame_rate (float): Envelope frames per second
+        
+    Returns:
+        float: Tempo in BPM (0.0 if the envelope is too short)
+    """
+    onset_env = onset_env - onset_env.mean()
+    n = len(onset_env)
+    min_lag = max(1, int(np.floor(60 * frame_rate / TEMPO_MAX_BPM)))
+    max_lag = min(n - 2, int(np.ceil(60 * frame_rate / TEMPO_MIN_BPM)))
+    if max_lag <= min_lag:
+        return 0.0
+    
+    spectrum = np.fft.rfft(onset_env, n=2 * n)
+    acf = np.fft.irfft(np.abs(spectrum) ** 2)[:n]
+    acf /= n - np.arange(n)  # Unbiased: long lags overlap fewer frames
+    
+    lags = np.arange(min_lag, max_lag + 1)
+    prior = np.exp(-0.5 * np.log2(60 * frame_rate / lags / TEMPO_PRIOR_BPM) ** 2)
+    lag = lags[np.argmax(acf[lags] * prior)]
+    
+    # Parabolic interpolation around the peak for sub-frame resolution
+    left, center, right = acf[lag - 1], acf[lag], acf[lag + 1]
+    curvature = left - 2 * center + right
+    shift = 0.5 * (left - right) / curvature if curvature < 0 else 0.0
+    return float(60 * frame_rate / (lag + shift))
+
+def estimate_tempo(y: np.ndarray, sr: int, hop_length: int = TEMPO_HOP) -> float:
+    """
+    Tempo-only estimate, much cheaper than librosa.beat.beat_track.
+    
+    The onset envelope uses a larger hop and fewer mel bands, and there is
+    no dynamic programming over beat positions. Accuracy against
+    beat_track can be checked with benchmark_analysis.py --tempo.
+    
+    Args:
+        y (np.ndarray): Mono audio signal
+        sr (int): Sample rate
+        hop_length (int): Onset envelope hop in samples
+        
+    Returns:
+        float: Tempo in BPM (0.0 if the signal is too short)
+    """
+    onset_env = librosa.onset.onset_strength(y=y, sr=sr, hop_length=hop_length, n_fft=2048, n_mels=40)
+    return tempo_from_onset_envelope(onset_env, sr / hop_length)
+
+def pitch_features(y: np.ndarray, sr: int) -> dict:
+    """Pitch statistics of analyze_melodic_content (without the contour)."""
+    print("- Tracking pitch")
+    melodic = analyze_melodic_content(y, sr=sr)
+    return {
+        'pitch_mean': melodic['pitch_mean'],
+        'pitch_variability': melodic['pitch_variability'],
+        'pitch_range': melodic['pitch_range']
+    }
+
+def analysis_mode(include_melodic: bool = False, streaming: bool = False,
+                  tempo_mode: str = 'beat_track') -> str:
+    """Label of the analysis settings, stored with reusable feature records."""
+    window = 'streaming' if streaming else 'window'
+    melodic = 'melodic' if include_melodic else 'basic'
+    return f"{window}/{tempo_mode}/{melodic}"
+
+class RunningStats:
+    """Running mean/std/max over frames, one value per feature row."""
+    
+    def __init__(self, n_features: int = 1):
+        self.count = 0
+        self.total = np.zeros(n_features)
+        self.total_sq = np.zeros(n_features)
+        self.max = np.full(n_features, -np.inf)
+    
+    def update(self, frames: np.ndarray) -> None:
+        """Add a (n_features, n_frames) block."""
+        frames = np.atleast_2d(frames).astype(np.float64)
+        if frames.shape[1] == 0:
+            return
+        self.count += frames.shape[1]
+        self.total += frames.sum(axis=1)
+        self.total_sq += np.square(frames).sum(axis=1)
+        self.max = np.maximum(self.max, frames.max(axis=1))
+    
+    def mean(self) -> np.ndarray:
+        return self.total / max(self.count, 1)
+    
+    def std(self) -> np.ndarray:
+        variance = self.total_sq / max(self.count, 1) - np.square(self.mean())
+        return np.sqrt(np.maximum(variance, 0))
+
+def extract_features(y: np.ndarray, sr: int, duration: float, include_melodic: bool = False,
+                     tempo_mode: str = 'beat_track') -> dict:
+    """
+    Extract features from an already decoded signal.
+    
+    Args:
+        y (np.ndarray): Mono audio signal (only read, never modified)
+        sr (int): Sample rate
+        duration (float): Full duration of the source file in seconds
+        include_melodic (bool): Also compute pitch statistics
+        tempo_mode (str): 'beat_track' (full beat tracking) or 'fast'
+            (estimate_tempo, tempo only)
+        
+    Returns:
+        dict: Dictionary containing extracted features
+    """
+    features = {}
+    features['duration'] = float(duration)  # Store full duration
+    
+    # Tempo
+    print("- Calculating tempo")
+    if tempo_mode == 'fast':
+        features['tempo'] = estimate_tempo(y, sr)
+    else:
+        tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
+        features['tempo'] = float(np.atleast_1d(tempo)[0])
+    
+    # MFCCs
+    print("- Extracting MFCCs")
+    mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
+    features['mfcc_mean'] = mfccs.mean(axis=1).tolist()
+    del mfccs  # Free memory
+    
+    # Spectral Centroid
+    print("- Calculating spectral centroid")
+    cent = librosa.feature.spectral_centroid(y=y, sr=sr)
+    features['spectral_centroid_mean'] = float(cent.mean())
+    del cent  # Free memory
+    
+    # Zero Crossing Rate
+    print("- Calculating zero crossing rate")
+    zcr = librosa.feature.zero_crossing_rate(y)
+    features['zcr_mean'] = float(zcr.mean())
+    del zcr  # Free memory
+    
+    # Melodic content (optional)
+    if include_melodic:
+        features.update(pitch_features(y, sr))
+    
+    print(f"""
+Analysis results:
+- Full Duration: {features['duration']:.2f} seconds
+- Analyzed Duration: {len(y) / sr:.2f} seconds
+- Tempo: {features['tempo']:.2f} BPM
+- Spectral Centroid: {features['spectral_centroid_mean']:.2f} Hz
+- Zero Crossing Rate: {features['zcr_mean']:.4f}
+    """)
+    
+    return features
+
+def load_analysis_window(audio_path: str):
+    """
+    Decode the part of a file analyzed in the default mode.
+    
+    Returns:
+        tuple: (mono signal of at most MAX_DURATION seconds, sample rate,
+            full duration in seconds)
+    """
+    # Load audio file in chunks
+    print("- Loading audio file")
+    duration = librosa.get_duration(path=audio_path)
+    
+    # Load only first 60 seconds if file is longer
+    if duration > MAX_DURATION:
+        print(f"- File duration: {duration:.1f}s. Analyzing first {MAX_DURATION}s only")
+        y, sr = librosa.load(audio_path, mono=True, duration=MAX_DURATION)
+    else:
+        y, sr = librosa.load(audio_path, mono=True)
+    return y, sr, duration
+
+def analyze_audio(audio_path: str, include_melodic: bool = False, streaming: bool = False,
+                  tempo_mode: str = 'beat_track') -> dict:
     """
     Extract audio features using librosa.
     
     Args:
         audio_path (str): Path to audio file (mp4)
+        include_melodic (bool): Also compute pitch statistics
+        streaming (bool): Analyze the full track block by block
+            (see analyze_audio_streaming)
+        tempo_mode (str): 'beat_track' or 'fast' (see extract_features)
         
     Returns:
         dict: Dictionary containing extracted features
     """
+    if streaming:
+        return analyze_audio_streaming(audio_path, include_melodic=include_melodic, tempo_mode=tempo_mode)
+    
     try:
         print("\nAnalyzing audio...")
+        y, sr, duration = load_analysis_window(audio_path)
+        
+        features = extract_features(y, sr, duration, include_melodic, tempo_mode)
+        
+        # Clean up
+        del y
+        gc.collect()  # Force garbage collection
+        
+        return features
+        
+    except Exception as e:
+        print(f"Error analyzing audio: {str(e)}")
+        raise
+    finally:
+        # Ensure memory is freed
+        gc.collect()
+
+def analyze_audio_streaming(audio_path: str, block_length: int = 256, include_melodic: bool = False,
+                            tempo_mode: str = 'beat_track') -> dict:
+    """
+    Extract features over the full track in constant memory.
+    
+    The file is read in blocks of block_length frames with librosa.stream and
+    only running aggregates are kept, so peak memory does not depend on track
+    length. Frames are not centered, so values differ slightly from
+    analyze_audio. Tempo is estimated from the onset envelope of the first
+    MAX_DURATION seconds, which is the only buffered series. Pitch
+    statistics, if requested, also cover the first MAX_DURATION seconds,
+    decoded directly at the pitch tracker's low sample rate.
+    
+    Args:
+        audio_path (str): Path to audio file (WAV or other soundfile format)
+        block_length (int): Frames per streamed block
+        include_melodic (bool): Also compute pitch statistics
+        tempo_mode (str): 'beat_track' or 'fast' (see extract_features)
         
-        # Load audio file in chunks
-        print("- Loading audio file")
+    Returns:
+        dict: Same keys as analyze_audio plus onset statistics
+    """
+    try:
+        print("\nAnalyzing audio (streaming)...")
         duration = librosa.get_duration(path=audio_path)
+        sr = librosa.get_samplerate(audio_path)
+        print(f"- File duration: {duration:.1f}s. Analyzing full track")
         
-        # Load only first 60 seconds if file is longer
-        MAX_DURATION = 60  # seconds
-        if duration > MAX_DURATION:
-            print(f"- File duration: {duration:.1f}s. Analyzing first {MAX_DURATION}s only")
-            y, sr = librosa.load(audio_path, mono=True, duration=MAX_DURATION)
-        else:
-            y, sr = librosa.load(audio_path, mono=True)
+        stream = librosa.stream(
+            audio_path,
+            block_length=block_length,
+            frame_length=FRAME_LENGTH,
+            hop_length=HOP_LENGTH,
+            mono=True,
+            fill_value=None  # Zero padding would add silent frames to every statistic
+        )
+        
+        mfcc_stats = RunningStats(13)
+        centroid_stats = RunningStats()
+        zcr_stats = RunningStats()
+        onset_stats = RunningStats()
+        tempo_frames = int(MAX_DURATION * sr / HOP_LENGTH)
+        tempo_onsets = []
+        buffered_onsets = 0
+        previous_mel = None
+        
+        for y_block in stream:
+            # The unpadded last block can be shorter than one frame
+            if len(y_block) < FRAME_LENGTH:
+                continue
+            
+            # One STFT per block shared by centroid, MFCC and onset strength
+            S = np.abs(librosa.stft(y_block, n_fft=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False))
+            mel_db = librosa.power_to_db(librosa.feature.melspectrogram(S=S**2, sr=sr))
+            
+            mfcc_stats.update(librosa.feature.mfcc(S=mel_db, n_mfcc=13))
+            centroid_stats.update(librosa.feature.spectral_centroid(S=S, sr=sr))
+            zcr_stats.update(librosa.feature.zero_crossing_rate(
+                y_block, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False
+            ))
+            
+            # Carry the last mel frame over so the onset flux is continuous
+            # across block boundaries
+            if previous_mel is not None:
+                onset = librosa.onset.onset_strength(
+                    S=np.hstack([previous_mel, mel_db]), sr=sr, center=False
+                )[1:]
+            else:
+                onset = librosa.onset.onset_strength(S=mel_db, sr=sr, center=False)
+            previous_mel = mel_db[:, -1:]
+            onset_stats.update(onset)
+            
+            if buffered_onsets < tempo_frames:
+                tempo_onsets.append(onset[:tempo_frames - buffered_onsets])
+                buffered_onsets += len(tempo_onsets[-1])
+            
+            del S, mel_db, onset
+        
+        if mfcc_stats.count == 0:
+            # Zero-filled means would be recorded as real observations
+            raise ValueError(f"Audio is shorter than one analysis frame ({FRAME_LENGTH} samples)")
         
-        # Extract features
         features = {}
-        features['duration'] = float(duration)  # Store full duration
+        features['duration'] = float(duration)
         
-        # Tempo
         print("- Calculating tempo")
-        tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
-        features['tempo'] = float(tempo)
-        
-        # MFCCs
-        print("- Extracting MFCCs")
-        mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13)
-        features['mfcc_mean'] = mfccs.mean(axis=1).tolist()
-        del mfccs  # Free memory
-        
-        # Spectral Centroid
-        print("- Calculating spectral centroid")
-        cent = librosa.feature.spectral_centroid(y=y, sr=sr)
-        features['spectral_centroid_mean'] = float(cent.mean())
-        del cent  # Free memory
-        
-        # Zero Crossing Rate
-        print("- Calculating zero crossing rate")
-        zcr = librosa.feature.zero_crossing_rate(y)
-        features['zcr_mean'] = float(zcr.mean())
-        del zcr  # Free memory
+        onset_env = np.concatenate(tempo_onsets) if tempo_onsets else np.zeros(1)
+        if tempo_mode == 'fast':
+            features['tempo'] = tempo_from_onset_envelope(onset_env, sr / HOP_LENGTH)
+        else:
+            tempo, _ = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr, hop_length=HOP_LENGTH)
+            features['tempo'] = float(np.atleast_1d(tempo)[0])
         
-        # Clean up
-        del y
-        gc.collect()  # Force garbage collection
+        features['mfcc_mean'] = mfcc_stats.mean().tolist()
+        features['spectral_centroid_mean'] = float(centroid_stats.mean()[0])
+        features['zcr_mean'] = float(zcr_stats.mean()[0])
+        features['onset_strength_mean'] = float(onset_stats.mean()[0])
+        features['onset_strength_std'] = float(onset_stats.std()[0])
+        features['onset_strength_max'] = float(onset_stats.max[0]) if onset_stats.count else 0.0
+        
+        if include_melodic:
+            y_melody, _ = librosa.load(audio_path, sr=MELODY_SR, mono=True, duration=MAX_DURATION)
+            features.update(pitch_features(y_melody, MELODY_SR))
+            del y_melody
         
         print(f"""
 Analysis results:
 - Full Duration: {features['duration']:.2f} seconds
-- Analyzed Duration: {min(duration, MAX_DURATION):.2f} seconds
+- Analyzed Duration: {features['duration']:.2f} seconds
 - Tempo: {features['tempo']:.2f} BPM
 - Spectral Centroid: {features['spectral_centroid_mean']:.2f} Hz
 - Zero Crossing Rate: {features['zcr_mean']:.4f}
@@ -75,5 +349,4 @@ Analysis results:
         print(f"Error analyzing audio: {str(e)}")
         raise
     finally:
-        # Ensure memory is freed
-        gc.collect()
\ No newline at end of file
+        gc.collect()
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np
+
+AUDIO_CACHE_DIR = Path('cache') / 'audio'
+PCM_SCALE = 32767
+
+def read_clip(root, entry: dict) -> np.ndarray:
+    """Map a cached clip and convert it to float32 in [-1, 1]."""
+    if entry['length'] == 0:
+        return np.zeros(0, dtype=np.float32)
+    pcm = np.memmap(Path(root) / entry['file'], dtype='<i2', mode='r', shape=(entry['length'],))
+    return pcm.astype(np.float32) / PCM_SCALE
+
+class AudioCache:
+    """
+    Decoded analysis windows stored as int16 PCM, indexed by video ID.
+
+    Each clip is a raw PCM file that is memory-mapped on read, so
+    re-analysis reads straight from the page cache. The total size is
+    capped and the least recently used clips are evicted first. The index
+    is only written by flush(), so call it at the end of a run; one process
+    should own a cache directory at a time.
+    """
+
+    def __init__(self, root=AUDIO_CACHE_DIR, max_bytes: int = 10 * 1024 ** 3):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.root / 'index.json'
+        self._entries = OrderedDict()  # video_id -> entry, least recent first
+        if self._index_path.exists():
+            with open(self._index_path, 'r') as f:
+                for entry in json.load(f):
+                    self._entries[entry['video_id']] = entry
+        self._dirty = False
+        self._bytes = sum(entry['length'] * 2 for entry in self._entries.values())
+        
+        # Clips written after the last flush are not indexed; drop them
+        indexed = {entry['file'] for entry in self._entries.values()}
+        for path in self.root.glob('*.pcm*'):
+            if path.name not in indexed:
+                path.unlink()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, video_id):
+        return video_id in self._entries
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def video_ids(self) -> list:
+        return list(self._entries)
+
+    def entry(self, video_id: str) -> dict:
+        """Index entry (file, length, sr, duration, url) of a cached clip."""
+        return self._entries[video_id]
+
+    def put(self, video_id: str, y: np.ndarray, sr: int, duration: float, url: str = None) -> None:
+        """
+        Store a decoded float signal as int16 PCM.
+
+        Args:
+            video_id (str): Cache key
+            y (np.ndarray): Mono signal in [-1, 1]
+            sr (int): Sample rate
+            duration (float): Full duration of the source file in seconds
+            url (str): Source URL, kept for re-analysis output
+        """
+        pcm = np.round(np.clip(y, -1.0, 1.0) * PCM_SCALE).astype('<i2')
+        if pcm.nbytes > self.max_bytes:
+            return
+        # Video IDs can fall back to full URLs, so hash them for file names
+        file_name = hashlib.sha1(video_id.encode('utf-8')).hexdigest() + '.pcm'
+        tmp_path = self.root / (file_name + '.tmp')
+        pcm.tofile(tmp_path)
+        os.replace(tmp_path, self.root / file_name)
+
+        if video_id in self._entries:
+            self._bytes -= self._entries.pop(video_id)['length'] * 2
+        self._bytes += pcm.nbytes
+        self._entries[video_id] = {
+            'video_id': video_id,
+            'file': file_name,
+            'length': int(len(pcm)),
+            'sr': int(sr),
+            'duration': float(duration),
+            'url': url,
+            'last_access': time.time()
+        }
+        self._evict()
+        self._dirty = True
+
+    def get_pcm(self, video_id: str) -> np.ndarray:
+        """Read-only int16 memory map of a cached clip (marks it as used)."""
+        entry = self._entries[video_id]
+        self._entries.move_to_end(video_id)
+        entry['last_access'] = time.time()
+        self._dirty = True
+        if entry['length'] == 0:
+            return np.zeros(0, dtype='<i2')
+        return np.memmap(self.root / entry['file'], dtype='<i2', mode='r', shape=(entry['length'],))
+
+    def get(self, video_id: str):
+        """
+        Decoded clip as float32, like librosa.load would return it.
+
+        Returns:
+            tuple: (signal, sample rate, full duration)
+        """
+        entry = self._entries[video_id]
+        self.get_pcm(video_id)  # Marks the clip as used
+        return read_clip(self.root, entry), entry['sr'], entry['duration']
+
+    def remove(self, video_id: str) -> None:
+        entry = self._entries.pop(video_id)
+        self._bytes -= entry['length'] * 2
+        try:
+            os.remove(self.root / entry['file'])
+        except FileNotFoundError:
+            pass
+        self._dirty = True
+
+    def _evict(self) -> None:
+        """Drop least recently used clips until the cache fits max_bytes."""
+        while self._bytes > self.max_bytes and self._entries:
+            video_id = next(iter(self._entries))
+            self.remove(video_id)
+            print(f"Evicted {video_id} from audio cache")
+
+    def flush(self, force: bool = False) -> None:
+        """Write the index (LRU order) if it changed."""
+        if not (self._dirty or force):
+            return
+        tmp_path = self._index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(list(self._entries.values()), f)
+        os.replace(tmp_path, self._index_path)
+        self._dirty = False
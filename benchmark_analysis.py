@@ -0,0 +1,144 @@
+import argparse
+import time
+import librosa
+import numpy as np
+from audio_analyzer import estimate_tempo
+from video_processor import analyze_melodic_content
+
+def synthesize_melody(duration: float, sr: int = 22050) -> np.ndarray:
+    """
+    Build a test signal: a stepwise sine melody over a click track.
+
+    Args:
+        duration (float): Length in seconds
+        sr (int): Sample rate
+
+    Returns:
+        np.ndarray: Mono float32 signal
+    """
+    t = np.arange(int(duration * sr)) / sr
+    notes = 261.63 * 2 ** (np.array([0, 2, 4, 5, 7, 5, 4, 2]) / 12)
+    freqs = notes[(t * 2).astype(int) % len(notes)]
+    melody = 0.5 * np.sin(2 * np.pi * np.cumsum(freqs) / sr)
+    clicks = librosa.clicks(times=np.arange(0, duration, 0.5), sr=sr, length=len(t))
+    return (melody + clicks).astype(np.float32)
+
+def synthesize_click_track(bpm: float, duration: float, sr: int = 22050, seed: int = 0) -> np.ndarray:
+    """
+    Build a tempo test signal: accented clicks at a known BPM over noise.
+
+    Args:
+        bpm (float): Tempo of the clicks
+        duration (float): Length in seconds
+        sr (int): Sample rate
+        seed (int): Noise seed
+
+    Returns:
+        np.ndarray: Mono float32 signal
+    """
+    length = int(duration * sr)
+    beats = np.arange(0, duration, 60 / bpm)
+    clicks = librosa.clicks(times=beats, sr=sr, length=length, click_freq=1000)
+    downbeats = librosa.clicks(times=beats[::4], sr=sr, length=length, click_freq=500)
+    noise = 0.05 * np.random.default_rng(seed).standard_normal(length)
+    return (clicks + downbeats + noise).astype(np.float32)
+
+def beat_track_tempo(y: np.ndarray, sr: int) -> float:
+    tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+    return float(np.atleast_1d(tempo)[0])
+
+def tempo_error(estimate: float, bpm: float, octave_tolerant: bool = False) -> float:
+    """Absolute BPM error, optionally against the closest of bpm/2, bpm, 2*bpm."""
+    targets = (bpm / 2, bpm, bpm * 2) if octave_tolerant else (bpm,)
+    return min(abs(estimate - target) for target in targets)
+
+def run_tempo_benchmark(tempos, duration: float, sr: int = 22050, repeat: int = 3) -> dict:
+    """
+    Compare beat tracking with the fast tempo estimator on click tracks.
+
+    Returns:
+        dict: Method name -> {'time', 'errors', 'octave_errors'}
+    """
+    methods = {'beat_track': beat_track_tempo, 'fast': estimate_tempo}
+    results = {name: {'time': 0.0, 'errors': [], 'octave_errors': []} for name in methods}
+    for bpm in tempos:
+        y = synthesize_click_track(bpm, duration, sr)
+        for name, method in methods.items():
+            result = results[name]
+            result['time'] += time_stage(lambda: method(y, sr), repeat)
+            estimate = method(y, sr)
+            result['errors'].append(tempo_error(estimate, bpm))
+            result['octave_errors'].append(tempo_error(estimate, bpm, octave_tolerant=True))
+    return results
+
+def print_tempo_benchmark(results: dict, tempos) -> None:
+    """Print time per track, raw errors and octave-tolerant errors per method."""
+    tempos = np.asarray(tempos, dtype=float)
+    print(f"{'method':<12} {'time/track':>10} {'median err':>11} {'within 4%':>10} {'octave err':>11}")
+    for name, result in results.items():
+        errors = np.array(result['errors'])
+        octave_errors = np.array(result['octave_errors'])
+        print(f"{name:<12} {result['time'] / len(tempos):9.3f}s {np.median(errors):10.2f} "
+              f"{np.mean(errors <= 0.04 * tempos):10.0%} {np.median(octave_errors):10.2f}")
+    speedup = results['beat_track']['time'] / results['fast']['time']
+    print(f"\nFast tempo estimate: {speedup:.1f}x faster than beat tracking")
+
+def time_stage(func, repeat: int = 3) -> float:
+    """Return the best wall-clock time of func() over repeat runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def analysis_stages(y: np.ndarray, sr: int) -> dict:
+    """Stages of analyze_audio plus the optional melodic stage."""
+    return {
+        'tempo': lambda: librosa.beat.beat_track(y=y, sr=sr),
+        'mfcc': lambda: librosa.feature.mfcc(y=y, sr=sr, n_mfcc=13),
+        'spectral_centroid': lambda: librosa.feature.spectral_centroid(y=y, sr=sr),
+        'zcr': lambda: librosa.feature.zero_crossing_rate(y),
+        'melodic': lambda: analyze_melodic_content(y, sr=sr),
+    }
+
+def run_benchmark(y: np.ndarray, sr: int, repeat: int = 3) -> dict:
+    """
+    Time each analysis stage on the same signal.
+
+    Returns:
+        dict: Stage name -> best time in seconds
+    """
+    return {name: time_stage(func, repeat) for name, func in analysis_stages(y, sr).items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audio analysis stages")
+    parser.add_argument('audio', nargs='?', help="Audio file (default: synthetic signal)")
+    parser.add_argument('--duration', type=float, default=60, help="Seconds to analyze")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tempo', action='store_true',
+                        help="Compare beat tracking with the fast tempo estimator on click tracks")
+    args = parser.parse_args()
+
+    if args.tempo:
+        tempos = np.arange(60, 181, 10)
+        print(f"\n=== Tempo accuracy on {len(tempos)} click tracks of {args.duration:.0f}s ===")
+        results = run_tempo_benchmark(tempos, args.duration, repeat=args.repeat)
+        print_tempo_benchmark(results, tempos)
+        return
+
+    if args.audio:
+        y, sr = librosa.load(args.audio, mono=True, duration=args.duration)
+    else:
+        sr = 22050
+        y = synthesize_melody(args.duration, sr)
+
+    print(f"\n=== Benchmarking {len(y) / sr:.1f}s of audio ===")
+    timings = run_benchmark(y, sr, args.repeat)
+    baseline = sum(t for name, t in timings.items() if name != 'melodic')
+    for name, seconds in timings.items():
+        print(f"- {name:<18} {seconds:8.3f}s")
+    print(f"\nMelodic stage: {timings['melodic'] / baseline:.0%} of the default analysis time")
+
+if __name__ == "__main__":
+    main()
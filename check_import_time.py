@@ -0,0 +1,58 @@
+import json
+import subprocess
+import sys
+
+# Entry point -> (seconds allowed for `import`, modules it must not load)
+IMPORT_BUDGETS = {
+    'download_worker': (0.5, ['librosa', 'sklearn', 'scipy', 'numba', 'pandas', 'dash']),
+    'analysis_worker': (0.5, ['yt_dlp', 'sklearn', 'pandas', 'dash', 'plotly']),
+    'main': (1.5, ['librosa', 'sklearn', 'scipy', 'numba', 'yt_dlp', 'dash']),
+    'run_server': (3.0, ['librosa', 'sklearn', 'numba', 'yt_dlp']),
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+from lazy_imports import is_loaded
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {forbidden!r} if is_loaded(m)]}}))
+"""
+
+def measure(module: str, forbidden: list) -> dict:
+    """Import a module in a fresh interpreter and report time and heavy modules."""
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(module=module, forbidden=forbidden)],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return {'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed'}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    """Check every entry point against its import-time budget; exit 1 on failure."""
+    failures = 0
+    print("\n=== Import-time budget check ===")
+    for module, (budget, forbidden) in IMPORT_BUDGETS.items():
+        # Best of three runs to smooth out cold disk caches
+        runs = [measure(module, forbidden) for _ in range(3)]
+        errors = [r['error'] for r in runs if 'error' in r]
+        if errors:
+            failures += 1
+            print(f"✗ {module}: import failed ({errors[0]})")
+            continue
+        best = min(runs, key=lambda r: r['seconds'])
+        problems = []
+        if best['seconds'] > budget:
+            problems.append(f"{best['seconds']:.2f}s > {budget:.2f}s")
+        if best['loaded']:
+            problems.append(f"loads {', '.join(best['loaded'])}")
+        if problems:
+            failures += 1
+            print(f"✗ {module}: {'; '.join(problems)}")
+        else:
+            print(f"✓ {module}: {best['seconds']:.2f}s (budget {budget:.2f}s)")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import hashlib
+from urllib.parse import urlparse, parse_qs
 import pandas as pd
 
 def read_youtube_data(excel_path: str) -> pd.DataFrame:
@@ -48,4 +50,45 @@ Data summary:
         
     except Exception as e:
         print(f"Error reading file: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+def extract_video_id(url: str) -> str:
+    """
+    Extract the YouTube video ID from a URL.
+    
+    Handles watch?v=, youtu.be/, /shorts/, /embed/ and /live/ URLs and
+    falls back to the URL itself when no ID can be found.
+    """
+    parsed = urlparse(url)
+    host = parsed.hostname or ''
+    parts = [part for part in parsed.path.split('/') if part]
+    if host.endswith('youtu.be') and parts:
+        return parts[0]
+    video_ids = parse_qs(parsed.query).get('v')
+    if video_ids:
+        return video_ids[0]
+    if len(parts) >= 2 and parts[0] in ('shorts', 'embed', 'live'):
+        return parts[1]
+    return url
+
+def shard_of(url: str, num_shards: int) -> int:
+    """Stable shard number of a video (same on every machine and run)."""
+    digest = hashlib.sha1(extract_video_id(url).encode('utf-8')).hexdigest()
+    return int(digest, 16) % num_shards
+
+def select_shard(df: pd.DataFrame, shard_index: int, num_shards: int) -> pd.DataFrame:
+    """
+    Keep the manifest rows whose video-ID hash falls into a shard.
+    
+    Args:
+        df (pd.DataFrame): Manifest from read_youtube_data
+        shard_index (int): Shard to keep, 0 <= shard_index < num_shards
+        num_shards (int): Total number of shards
+        
+    Returns:
+        pd.DataFrame: Rows of this shard, in the original order
+    """
+    if not 0 <= shard_index < num_shards:
+        raise ValueError(f"Invalid shard {shard_index} for {num_shards} shards")
+    mask = df['url'].map(lambda url: shard_of(url, num_shards) == shard_index)
+    return df[mask]
@@ -0,0 +1,46 @@
+import argparse
+import sys
+from failure_cache import FailureCache, FAILURE_CACHE_PATH
+from video_processor import download_audio, DOWNLOADS_DIR
+
+def main():
+    """
+    Download-only worker: fetch videos and convert them to WAV.
+
+    Reads URLs from the command line (or stdin) and prints one WAV path per
+    line, ready to be piped into analysis_worker.py. Does not import the
+    analysis stack.
+    """
+    parser = argparse.ArgumentParser(description="Download YouTube audio as WAV")
+    parser.add_argument('urls', nargs='*', help="Video URLs (default: read from stdin)")
+    parser.add_argument('--downloads-dir', default=DOWNLOADS_DIR)
+    parser.add_argument('--max-retries', type=int, default=3)
+    parser.add_argument('--failure-cache', default=str(FAILURE_CACHE_PATH),
+                        help="Cache of permanently unavailable videos ('' to disable)")
+    args = parser.parse_args()
+
+    failure_cache = FailureCache(args.failure_cache) if args.failure_cache else None
+
+    urls = args.urls or (line.strip() for line in sys.stdin)
+    failed = 0
+    try:
+        for url in urls:
+            if not url:
+                continue
+            # Progress goes to stderr so stdout only carries the WAV paths
+            sys.stdout, stdout = sys.stderr, sys.stdout
+            try:
+                wav_path = download_audio(url, args.max_retries, args.downloads_dir, failure_cache)
+            finally:
+                sys.stdout = stdout
+            if wav_path:
+                print(f"{url}\t{wav_path}", flush=True)
+            else:
+                failed += 1
+    finally:
+        if failure_cache is not None:
+            failure_cache.flush()
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
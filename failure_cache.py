@@ -0,0 +1,67 @@
+import json
+import os
+import time
+from pathlib import Path
+
+FAILURE_CACHE_PATH = Path('cache') / 'failed_videos.json'
+FAILURE_TTL_DAYS = 30  # Videos can come back (unblocked, made public again)
+
+class FailureCache:
+    """
+    URLs whose download failed permanently (private, removed, blocked).
+
+    Entries expire after ttl_days, so a video that becomes available again
+    is retried eventually. Like AudioCache, the file is only written by
+    flush() and one process should own it at a time.
+    """
+
+    def __init__(self, path=FAILURE_CACHE_PATH, ttl_days: float = FAILURE_TTL_DAYS):
+        self.path = Path(path)
+        self.ttl = ttl_days * 24 * 3600
+        self._entries = {}
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                self._entries = json.load(f)
+        now = time.time()
+        expired = [url for url, entry in self._entries.items() if now - entry['failed_at'] > self.ttl]
+        for url in expired:
+            del self._entries[url]
+        self._dirty = bool(expired)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, url):
+        entry = self._entries.get(url)
+        return entry is not None and time.time() - entry['failed_at'] <= self.ttl
+
+    def reason(self, url: str) -> str:
+        """Error message recorded for a cached URL."""
+        return self._entries[url]['reason']
+
+    def add(self, url: str, reason: str) -> None:
+        self._entries[url] = {'reason': reason, 'failed_at': time.time()}
+        self._dirty = True
+
+    def remove(self, url: str) -> None:
+        if self._entries.pop(url, None) is not None:
+            self._dirty = True
+
+    def update(self, other: 'FailureCache') -> None:
+        """Add the entries of another cache, keeping the latest failure per URL."""
+        for url, entry in other._entries.items():
+            current = self._entries.get(url)
+            if current is None or entry['failed_at'] > current['failed_at']:
+                self._entries[url] = dict(entry)
+                self._dirty = True
+
+    def flush(self, force: bool = False) -> None:
+        """Write the cache if it changed."""
+        if not (self._dirty or force):
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
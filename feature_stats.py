@@ -0,0 +1,150 @@
+import json
+import math
+from pathlib import Path
+import numpy as np
+
+FEATURE_STATS_PATH = Path('results') / 'feature_stats.json'
+N_MFCC = 13
+FEATURE_NAMES = (
+    ['tempo', 'spectral_centroid_mean', 'zcr_mean', 'duration', 'views', 'log_views']
+    + [f'mfcc_{i}' for i in range(N_MFCC)]
+)
+
+def feature_vector(record: dict):
+    """
+    Feature vector of a result record in FEATURE_NAMES order.
+
+    Returns:
+        np.ndarray: Values, or None if the record is incomplete
+    """
+    try:
+        views = float(record['views'])
+        mfcc = [float(v) for v in record['mfcc_mean']]
+        values = [
+            float(record['tempo']),
+            float(record['spectral_centroid_mean']),
+            float(record['zcr_mean']),
+            float(record['duration']),
+            views,
+            math.log10(views + 1)
+        ] + mfcc
+    except (KeyError, TypeError, ValueError):
+        return None
+    if len(mfcc) != N_MFCC:
+        return None
+    vector = np.array(values)
+    return vector if np.all(np.isfinite(vector)) else None
+
+class FeatureStatistics:
+    """
+    Running means, variances and covariances of all result features.
+
+    Each update is O(features²) (Welford's algorithm on the co-moment
+    matrix), so summaries and correlation matrices never need a pass over
+    the stored results.
+    """
+
+    def __init__(self, names=FEATURE_NAMES):
+        self.names = list(names)
+        self.count = 0
+        self.mean = np.zeros(len(self.names))
+        self.total = np.zeros(len(self.names))
+        self.comoment = np.zeros((len(self.names), len(self.names)))
+        self.minimum = np.full(len(self.names), np.inf)
+        self.maximum = np.full(len(self.names), -np.inf)
+
+    def update(self, record: dict) -> bool:
+        """Add one result record; returns False if it was incomplete."""
+        x = feature_vector(record)
+        if x is None:
+            return False
+        self.count += 1
+        self.total += x
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.comoment += np.outer(delta, x - self.mean)
+        np.minimum(self.minimum, x, out=self.minimum)
+        np.maximum(self.maximum, x, out=self.maximum)
+        return True
+
+    @classmethod
+    def from_records(cls, records):
+        stats = cls()
+        for record in records:
+            stats.update(record)
+        return stats
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray):
+        """
+        Statistics of complete rows in FEATURE_NAMES order, computed in one
+        batch (see ResultTable.feature_matrix).
+        """
+        stats = cls()
+        matrix = np.asarray(matrix, dtype=np.float64)
+        stats.count = len(matrix)
+        if stats.count:
+            stats.total = matrix.sum(axis=0)
+            stats.mean = stats.total / stats.count
+            centered = matrix - stats.mean
+            stats.comoment = centered.T @ centered
+            stats.minimum = matrix.min(axis=0)
+            stats.maximum = matrix.max(axis=0)
+        return stats
+
+    def covariance(self) -> np.ndarray:
+        """Sample covariance matrix (ddof=1, like pandas)."""
+        if self.count < 2:
+            return np.full_like(self.comoment, np.nan)
+        return self.comoment / (self.count - 1)
+
+    def variance(self) -> np.ndarray:
+        return np.diag(self.covariance())
+
+    def correlation(self, names=None) -> np.ndarray:
+        """Pearson correlation matrix, optionally restricted to some features."""
+        idx = [self.names.index(n) for n in (names or self.names)]
+        cov = self.covariance()[np.ix_(idx, idx)]
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return cov / np.outer(std, std)
+
+    def summary(self, name: str) -> dict:
+        """Count, total, mean, std, min and max of one feature."""
+        i = self.names.index(name)
+        return {
+            'count': self.count,
+            'total': float(self.total[i]),
+            'mean': float(self.mean[i]),
+            'std': float(np.sqrt(self.variance()[i])),
+            'min': float(self.minimum[i]),
+            'max': float(self.maximum[i])
+        }
+
+    def save(self, path=FEATURE_STATS_PATH) -> None:
+        with open(path, 'w') as f:
+            json.dump({
+                'names': self.names,
+                'count': self.count,
+                'mean': self.mean.tolist(),
+                'total': self.total.tolist(),
+                'comoment': self.comoment.tolist(),
+                'min': self.minimum.tolist(),
+                'max': self.maximum.tolist()
+            }, f)
+
+    @classmethod
+    def load(cls, path=FEATURE_STATS_PATH):
+        """Load saved statistics, or None if there are none."""
+        if not Path(path).exists():
+            return None
+        with open(path, 'r') as f:
+            data = json.load(f)
+        stats = cls(data['names'])
+        stats.count = data['count']
+        stats.mean = np.array(data['mean'])
+        stats.total = np.array(data['total'])
+        stats.comoment = np.array(data['comoment'])
+        stats.minimum = np.array(data['min'])
+        stats.maximum = np.array(data['max'])
+        return stats
@@ -0,0 +1,223 @@
+import json
+from collections import Counter
+from pathlib import Path
+import numpy as np
+from lazy_imports import lazy_import
+
+librosa = lazy_import('librosa')
+
+FINGERPRINT_SECONDS = 15     # Only the start of the track is fingerprinted
+FINGERPRINT_SR = 5512        # Bands stop at 2 kHz, so a low rate is enough
+FINGERPRINT_N_FFT = 2048     # ~0.37s frames
+FINGERPRINT_HOP = 256        # ~46ms between sub-fingerprints
+BAND_EDGES = np.geomspace(300, 2000, 34)  # 33 bands -> 32 bits per frame
+MAX_BIT_ERROR_RATE = 0.25    # Unrelated audio sits around 0.5
+MIN_OVERLAP_FRAMES = 64
+DURATION_TOLERANCE = 1.0     # Seconds, or 1% of the duration if larger
+FINGERPRINT_VERSION = 2      # Entries of other versions are not comparable
+# Words of frames without band structure (silence, clipping); they would
+# vote for every track with a silent intro, so they are never indexed
+DEGENERATE_WORDS = (0, 0xFFFFFFFF)
+MAX_WORD_HITS = 1000         # Words indexed this often are ignored when voting
+
+def compute_fingerprint(y: np.ndarray, sr: int) -> np.ndarray:
+    """
+    Compute a binary audio fingerprint (one 32-bit word per frame).
+
+    Each bit is the sign of the change in energy difference between two
+    adjacent bands across two consecutive frames, which is robust to
+    re-encoding, volume changes and small EQ differences.
+
+    Args:
+        y (np.ndarray): Mono audio signal
+        sr (int): Sample rate
+
+    Returns:
+        np.ndarray: uint32 sub-fingerprints
+    """
+    if sr != FINGERPRINT_SR:
+        y = librosa.resample(y, orig_sr=sr, target_sr=FINGERPRINT_SR)
+    y = y[:FINGERPRINT_SECONDS * FINGERPRINT_SR]
+    if len(y) < FINGERPRINT_N_FFT:
+        return np.zeros(0, dtype=np.uint32)
+
+    power = np.abs(librosa.stft(y, n_fft=FINGERPRINT_N_FFT, hop_length=FINGERPRINT_HOP, center=False)) ** 2
+    freqs = librosa.fft_frequencies(sr=FINGERPRINT_SR, n_fft=FINGERPRINT_N_FFT)
+    starts = np.searchsorted(freqs, BAND_EDGES)
+    # The last reduceat segment runs to Nyquist and is dropped
+    bands = np.add.reduceat(power, starts, axis=0)[:-1]
+
+    band_diff = bands[:-1] - bands[1:]
+    bits = (band_diff[:, 1:] - band_diff[:, :-1]) > 0
+    packed = np.packbits(np.ascontiguousarray(bits.T), axis=1, bitorder='little')
+    return np.ascontiguousarray(packed).view('<u4').ravel()
+
+def fingerprint_file(audio_path: str) -> np.ndarray:
+    """Fingerprint the first FINGERPRINT_SECONDS of an audio file."""
+    y, sr = librosa.load(audio_path, sr=FINGERPRINT_SR, mono=True, duration=FINGERPRINT_SECONDS)
+    return compute_fingerprint(y, sr)
+
+def audio_duration(audio_path: str) -> float:
+    """Full duration of an audio file in seconds (reads the header only for WAV)."""
+    return float(librosa.get_duration(path=audio_path))
+
+def bit_error_rate(a: np.ndarray, b: np.ndarray) -> float:
+    """Fraction of differing bits between two equal-length fingerprints."""
+    if len(a) == 0:
+        return 1.0
+    return float(np.unpackbits(np.bitwise_xor(a, b).view(np.uint8)).mean())
+
+def informative_frames(fingerprint: np.ndarray) -> np.ndarray:
+    """Mask of the sub-fingerprints that are not DEGENERATE_WORDS."""
+    return ~np.isin(fingerprint, DEGENERATE_WORDS)
+
+def reused_features(match: dict, key: str) -> dict:
+    """Copy of a matched feature record, tagged with the video it came from."""
+    features = dict(match['features'])
+    if match['key'] != key:
+        features['duplicate_of'] = match['key']
+    return features
+
+class FingerprintIndex:
+    """
+    Fingerprints of analyzed videos with their feature records.
+
+    Candidates are found through exact sub-fingerprint hits and verified
+    by the bit error rate at the most voted alignment, both over
+    informative frames only, so silence never makes two tracks alike.
+    Only the start of
+    each track is fingerprinted, so a match is only accepted if the full
+    durations agree as well, which keeps videos that merely share an intro
+    apart. Each entry also records the analysis mode its features were
+    computed with; entries of another mode never match.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self._lookup = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, key: str, fingerprint: np.ndarray, features: dict, duration: float = None,
+            mode: str = None) -> None:
+        """
+        Index a fingerprint under key with the features computed for it.
+
+        Args:
+            key (str): Video URL
+            fingerprint (np.ndarray): Output of compute_fingerprint
+            features (dict): Feature record to reuse for duplicates
+            duration (float): Full duration in seconds (default: features['duration'])
+            mode (str): Analysis mode of the features (see audio_analyzer.analysis_mode)
+        """
+        fingerprint = np.asarray(fingerprint, dtype=np.uint32)
+        if key in self.entries:
+            self.remove(key)
+        if duration is None:
+            duration = features.get('duration')
+        self.entries[key] = {
+            'fingerprint': fingerprint,
+            'features': features,
+            'duration': duration,
+            'mode': mode
+        }
+        for position in np.flatnonzero(informative_frames(fingerprint)).tolist():
+            self._lookup.setdefault(int(fingerprint[position]), []).append((key, position))
+
+    def remove(self, key: str) -> None:
+        entry = self.entries.pop(key)
+        fingerprint = entry['fingerprint']
+        for word in set(fingerprint[informative_frames(fingerprint)].tolist()):
+            hits = [hit for hit in self._lookup[word] if hit[0] != key]
+            if hits:
+                self._lookup[word] = hits
+            else:
+                del self._lookup[word]
+
+    def _compatible(self, entry: dict, duration: float, mode: str) -> bool:
+        if entry['mode'] != mode or entry['duration'] is None or duration is None:
+            return False
+        tolerance = max(DURATION_TOLERANCE, 0.01 * duration)
+        return abs(entry['duration'] - duration) <= tolerance
+
+    def match(self, fingerprint: np.ndarray, duration: float, mode: str = None, exclude: str = None):
+        """
+        Find an indexed recording matching the fingerprint.
+
+        Args:
+            fingerprint (np.ndarray): Fingerprint of the query
+            duration (float): Full duration of the query in seconds
+            mode (str): Analysis mode the reused features must come from
+            exclude (str): Key to ignore, normally the query's own URL, so a
+                rerun analyzes a video again instead of matching its old entry
+
+        Returns:
+            dict: {'key', 'features', 'bit_error_rate'} or None
+        """
+        fingerprint = np.asarray(fingerprint, dtype=np.uint32)
+        votes = Counter()
+        for position in np.flatnonzero(informative_frames(fingerprint)).tolist():
+            hits = self._lookup.get(int(fingerprint[position]), ())
+            if len(hits) > MAX_WORD_HITS:
+                continue
+            for key, indexed_position in hits:
+                votes[(key, position - indexed_position)] += 1
+
+        checked = {exclude}
+        for (key, offset), _ in votes.most_common():
+            if key in checked:
+                continue
+            checked.add(key)
+            entry = self.entries[key]
+            if not self._compatible(entry, duration, mode):
+                continue
+            indexed = entry['fingerprint']
+            query = fingerprint[max(offset, 0):]
+            indexed = indexed[max(-offset, 0):]
+            overlap = min(len(query), len(indexed))
+            query, indexed = query[:overlap], indexed[:overlap]
+            informative = informative_frames(query) & informative_frames(indexed)
+            if informative.sum() < MIN_OVERLAP_FRAMES:
+                continue
+            error_rate = bit_error_rate(query[informative], indexed[informative])
+            if error_rate <= MAX_BIT_ERROR_RATE:
+                return {
+                    'key': key,
+                    'features': entry['features'],
+                    'bit_error_rate': error_rate
+                }
+        return None
+
+    def save(self, path) -> None:
+        """Save the index as JSON."""
+        data = [
+            {
+                'key': key,
+                'fingerprint': entry['fingerprint'].tolist(),
+                'features': entry['features'],
+                'duration': entry['duration'],
+                'mode': entry['mode'],
+                'version': FINGERPRINT_VERSION
+            }
+            for key, entry in self.entries.items()
+        ]
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index saved with save(); a missing file gives an empty index.
+
+        Entries of an older fingerprint version are dropped.
+        """
+        index = cls()
+        if Path(path).exists():
+            with open(path, 'r') as f:
+                for entry in json.load(f):
+                    if entry.get('version') != FINGERPRINT_VERSION:
+                        continue
+                    index.add(entry['key'], entry['fingerprint'], entry['features'],
+                              entry['duration'], entry['mode'])
+        return index
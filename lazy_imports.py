@@ -0,0 +1,33 @@
+import importlib.util
+import sys
+
+def lazy_import(name: str):
+    """
+    Import a module on first attribute access instead of right away.
+
+    Used for the heavy scientific and download stacks (librosa, yt-dlp,
+    plotly.express) so entry points only pay for what they actually use.
+    Raises ModuleNotFoundError immediately if the module is not installed.
+
+    Args:
+        name (str): Module name, e.g. 'librosa'
+
+    Returns:
+        module: Module object that loads itself when first used
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+def is_loaded(name: str) -> bool:
+    """True if a module has actually been executed (not just lazily registered)."""
+    module = sys.modules.get(name)
+    return module is not None and not isinstance(module, importlib.util._LazyModule)
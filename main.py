@@ -1,9 +1,18 @@
+import argparse
+import asyncio
 import logging
+import os
 from pathlib import Path
-from data_reader import read_youtube_data
-from video_processor import download_audio, cleanup_files, cleanup_downloads_folder, get_free_space
-from audio_analyzer import analyze_audio
-from result_writer import save_results
+from data_reader import read_youtube_data, select_shard, extract_video_id
+from video_processor import download_audio, cleanup_files, cleanup_downloads_folder, get_free_space, DOWNLOADS_DIR
+from audio_analyzer import analyze_audio, load_analysis_window, extract_features, analysis_mode
+from audio_cache import AudioCache, AUDIO_CACHE_DIR
+from failure_cache import FailureCache, FAILURE_CACHE_PATH, FAILURE_TTL_DAYS
+from feature_stats import FeatureStatistics
+from result_table import ResultTable
+from result_writer import save_results, save_shard_results, merge_shard_results, SHARDS_DIR
+from fingerprint import FingerprintIndex, fingerprint_file, audio_duration, reused_features
+from async_pipeline import AsyncPipeline
 
 # Configure logging with more detailed format
 logging.basicConfig(
@@ -21,14 +30,152 @@ logging.getLogger('librosa').setLevel(logging.WARNING)
 
 logger = logging.getLogger(__name__)
 
-def main():
+# Set ANALYSIS_MODE=streaming to analyze full tracks in constant memory
+STREAMING = os.environ.get('ANALYSIS_MODE') == 'streaming'
+
+# Set TEMPO_MODE=fast to estimate tempo without full beat tracking
+TEMPO_MODE = os.environ.get('TEMPO_MODE', 'beat_track')
+
+# Set MELODIC_FEATURES=1 to add pitch statistics to every result
+INCLUDE_MELODIC = os.environ.get('MELODIC_FEATURES') == '1'
+
+# Features are only reused from duplicates analyzed with the same settings
+FEATURE_MODE = analysis_mode(INCLUDE_MELODIC, STREAMING, TEMPO_MODE)
+
+FINGERPRINT_INDEX_PATH = Path('results') / 'fingerprint_index.json'
+
+# Set AUDIO_CACHE_GB to keep decoded analysis windows for reanalyze.py
+AUDIO_CACHE_GB = float(os.environ.get('AUDIO_CACHE_GB', 0))
+
+# Days before a permanently failed video is tried again
+FAILURE_TTL = float(os.environ.get('FAILURE_TTL_DAYS', FAILURE_TTL_DAYS))
+
+def shard_fingerprint_path(shard_index: int, num_shards: int) -> Path:
+    """Fingerprint index written by one shard (merged by merge_shards)."""
+    return SHARDS_DIR / f'fingerprint_index.shard-{shard_index}-of-{num_shards}.json'
+
+def shard_failure_cache_path(shard_index: int, num_shards: int) -> Path:
+    """Failure cache kept by one shard (merged by merge_shards)."""
+    return FAILURE_CACHE_PATH.with_name(f"failed_videos-shard-{shard_index}-of-{num_shards}.json")
+
+def process_videos(df, fingerprints: FingerprintIndex, downloads_dir: str = DOWNLOADS_DIR,
+                   audio_cache: AudioCache = None, failure_cache: FailureCache = None):
+    """
+    Download and analyze videos one at a time.
+    
+    Args:
+        df (pd.DataFrame): Manifest rows with url and views
+        fingerprints (FingerprintIndex): Index used to skip duplicate audio
+        downloads_dir (str): Folder for temporary audio files
+        audio_cache (AudioCache): Optional cache for decoded analysis windows
+        failure_cache (FailureCache): Optional cache of permanently failing
+            URLs, skipped without any download attempt
+        
+    Returns:
+        tuple: (ResultTable, stats dict, FeatureStatistics of the results)
+    """
+    total_videos = len(df)
+    results = ResultTable(total_videos)
+    feature_stats = FeatureStatistics()
+    successful = 0
+    failed = 0
+    duplicates = 0
+    skipped = 0
+    
+    for idx, (_, row) in enumerate(df.iterrows()):
+        try:
+            video_url = row['url']
+            views = row['views']
+            print(f"\nProcessing video {idx + 1}/{total_videos}")
+            print(f"URL: {video_url}")
+            print(f"Views: {views:,}")
+            
+            if failure_cache is not None and video_url in failure_cache:
+                skipped += 1
+                print(f"↷ Skipping known unavailable video: {failure_cache.reason(video_url)}")
+                continue
+            
+            # Check disk space before each download
+            free_space = get_free_space(".")
+            print(f"Available disk space: {free_space:.2f}GB")
+            
+            # Download audio
+            audio_path = download_audio(video_url, downloads_dir=downloads_dir, failure_cache=failure_cache)
+            if audio_path:
+                try:
+                    # Skip the full analysis for reuploads of known audio
+                    fingerprint = fingerprint_file(audio_path)
+                    duration = audio_duration(audio_path)
+                    match = fingerprints.match(fingerprint, duration, FEATURE_MODE, exclude=video_url)
+                    if match:
+                        print(f"↺ Same audio as {match['key']}, reusing its features")
+                        features = reused_features(match, video_url)
+                        duplicates += 1
+                    elif audio_cache is not None:
+                        # Decode once, keep the window for re-analysis
+                        print("\nAnalyzing audio...")
+                        y, sr, duration = load_analysis_window(audio_path)
+                        audio_cache.put(extract_video_id(video_url), y, sr, duration, video_url)
+                        features = extract_features(y, sr, duration, include_melodic=INCLUDE_MELODIC, tempo_mode=TEMPO_MODE)
+                        del y
+                        fingerprints.add(video_url, fingerprint, dict(features), duration, FEATURE_MODE)
+                    else:
+                        # Analyze audio
+                        features = analyze_audio(audio_path, include_melodic=INCLUDE_MELODIC, streaming=STREAMING,
+                                                 tempo_mode=TEMPO_MODE)
+                        fingerprints.add(video_url, fingerprint, dict(features), duration, FEATURE_MODE)
+                    features['url'] = video_url
+                    features['views'] = views
+                    results.append(features)
+                    feature_stats.update(features)
+                    successful += 1
+                    print(f"✓ Successfully processed video {idx + 1}/{total_videos}")
+                finally:
+                    # Clean up audio file after analysis
+                    cleanup_files(audio_path)
+            else:
+                failed += 1
+                print(f"✗ Failed to download video {idx + 1}/{total_videos}")
+            
+        except Exception as e:
+            failed += 1
+            print(f"✗ Error processing video: {str(e)}")
+            continue
+        finally:
+            # Clean up any remaining files after each video
+            cleanup_downloads_folder(downloads_dir)
+    
+    stats = {
+        'videos': total_videos,
+        'successful': successful,
+        'failed': failed,
+        'duplicates': duplicates,
+        'skipped': skipped
+    }
+    return results, stats, feature_stats
+
+def main(shard_index: int = None, num_shards: int = 1, use_async: bool = False, max_downloads: int = 64):
+    """
+    Download and analyze the videos of the manifest.
+    
+    Args:
+        shard_index (int): Only process this shard of the manifest and write
+            partial results for merge_shards (None processes everything)
+        num_shards (int): Total number of shards
+        use_async (bool): Process videos concurrently with AsyncPipeline
+        max_downloads (int): Downloads in flight when use_async is set
+    """
+    sharded = shard_index is not None
+    # Each shard gets its own downloads folder so local shard processes
+    # do not delete each other's files
+    downloads_dir = f"{DOWNLOADS_DIR}-shard-{shard_index}" if sharded else DOWNLOADS_DIR
     try:
         # Clean up any leftover files from previous runs
         print("\n=== Cleaning up old files ===")
-        cleanup_downloads_folder()
+        cleanup_downloads_folder(downloads_dir)
         
         # Create necessary directories
-        Path("downloads").mkdir(exist_ok=True)
+        Path(downloads_dir).mkdir(exist_ok=True)
         Path("results").mkdir(exist_ok=True)
         
         # Check initial disk space
@@ -38,57 +185,74 @@ def main():
         # Read YouTube data
         print("\n=== Reading YouTube Data ===")
         df = read_youtube_data("bebefinn.xlsx")
+        if sharded:
+            df = select_shard(df, shard_index, num_shards)
+            print(f"\nShard {shard_index + 1}/{num_shards}")
         total_videos = len(df)
         print(f"\nFound {total_videos} videos to process\n")
         
-        # Process each video
-        results = []
-        successful = 0
-        failed = 0
+        # Load fingerprints of previously analyzed videos
+        fingerprints = FingerprintIndex.load(FINGERPRINT_INDEX_PATH)
+        print(f"Loaded {len(fingerprints)} audio fingerprints")
+        
+        # Videos that failed permanently in earlier runs are skipped. Shards
+        # keep their own file; a video always lands in the same shard
+        failure_path = shard_failure_cache_path(shard_index, num_shards) if sharded else FAILURE_CACHE_PATH
+        failure_cache = FailureCache(failure_path, ttl_days=FAILURE_TTL)
+        print(f"Loaded {len(failure_cache)} known unavailable videos")
         
+        # Process each video
         print("=== Processing Videos ===")
-        for idx, row in df.iterrows():
-            try:
-                video_url = row['url']
-                views = row['views']
-                print(f"\nProcessing video {idx + 1}/{total_videos}")
-                print(f"URL: {video_url}")
-                print(f"Views: {views:,}")
-                
-                # Check disk space before each download
-                free_space = get_free_space(".")
-                print(f"Available disk space: {free_space:.2f}GB")
-                
-                # Download audio
-                audio_path = download_audio(video_url)
-                if audio_path:
-                    try:
-                        # Analyze audio
-                        features = analyze_audio(audio_path)
-                        features['url'] = video_url
-                        features['views'] = views
-                        results.append(features)
-                        successful += 1
-                        print(f"✓ Successfully processed video {idx + 1}/{total_videos}")
-                    finally:
-                        # Clean up audio file after analysis
-                        cleanup_files(audio_path)
-                else:
-                    failed += 1
-                    print(f"✗ Failed to download video {idx + 1}/{total_videos}")
-                
-            except Exception as e:
-                failed += 1
-                print(f"✗ Error processing video: {str(e)}")
-                continue
-            finally:
-                # Clean up any remaining files after each video
-                cleanup_downloads_folder()
+        audio_cache = None
+        if AUDIO_CACHE_GB > 0 and STREAMING:
+            print("Warning: AUDIO_CACHE_GB is ignored in streaming mode (no analysis window is decoded)")
+        elif AUDIO_CACHE_GB > 0:
+            # Shards running side by side each need their own cache owner
+            cache_dir = AUDIO_CACHE_DIR.with_name(f"audio-shard-{shard_index}") if sharded else AUDIO_CACHE_DIR
+            audio_cache = AudioCache(cache_dir, max_bytes=int(AUDIO_CACHE_GB * 1024 ** 3))
+        try:
+            if use_async:
+                pipeline = AsyncPipeline(
+                    fingerprints,
+                    max_downloads=max_downloads,
+                    downloads_dir=downloads_dir,
+                    streaming=STREAMING,
+                    tempo_mode=TEMPO_MODE,
+                    include_melodic=INCLUDE_MELODIC,
+                    failure_cache=failure_cache,
+                    audio_cache=audio_cache
+                )
+                results = asyncio.run(pipeline.run(zip(df['url'], df['views'])))
+                stats = pipeline.stats
+                feature_stats = pipeline.feature_stats
+            else:
+                results, stats, feature_stats = process_videos(
+                    df, fingerprints, downloads_dir, audio_cache, failure_cache
+                )
+        finally:
+            failure_cache.flush()
+            if audio_cache is not None:
+                audio_cache.flush()
+        successful = stats['successful']
+        failed = stats['failed']
+        duplicates = stats['duplicates']
+        skipped = stats['skipped']
+        
+        if sharded:
+            # Partial output is written even when empty so the merge can
+            # tell a finished shard from a missing one
+            print("\n=== Saving Shard Results ===")
+            save_shard_results(results, stats, shard_index, num_shards)
+            fingerprints.save(shard_fingerprint_path(shard_index, num_shards))
+            print(f"Shard {shard_index + 1}/{num_shards}: {successful}/{total_videos} processed, {failed} failed")
+            return
+        
+        fingerprints.save(FINGERPRINT_INDEX_PATH)
         
         # Save results
         if results:
             print("\n=== Saving Results ===")
-            save_results(results)
+            save_results(results, feature_stats)
             success_rate = (successful/total_videos)*100
             print(f"""
 Analysis completed!
@@ -96,6 +260,8 @@ Analysis completed!
 Total videos: {total_videos}
 Successfully processed: {successful}
 Failed: {failed}
+Reused from duplicates: {duplicates}
+Skipped as unavailable: {skipped}
 Success rate: {success_rate:.1f}%
             """)
         else:
@@ -107,9 +273,62 @@ Success rate: {success_rate:.1f}%
     finally:
         # Final cleanup
         print("\n=== Final Cleanup ===")
-        cleanup_downloads_folder()
+        cleanup_downloads_folder(downloads_dir)
+
+def merge_shards(num_shards: int):
+    """
+    Merge the partial outputs of a sharded run into the final results.
+    
+    Args:
+        num_shards (int): Total number of shards of the run
+    """
+    print(f"\n=== Merging {num_shards} Shards ===")
+    results, shard_stats = merge_shard_results(num_shards)
+    
+    for shard_index, stats in shard_stats.items():
+        if stats.get('missing'):
+            print(f"- Shard {shard_index}: missing")
+            continue
+        print(f"- Shard {shard_index}: {stats['videos']} videos, {stats['successful']} processed, "
+              f"{stats['failed']} failed, {stats.get('skipped', 0)} skipped as unavailable, "
+              f"{stats['duplicates_removed']} duplicates removed")
+    
+    missing = [i for i, stats in shard_stats.items() if stats.get('missing')]
+    if missing:
+        raise RuntimeError(f"Missing output for shards {missing}; rerun them before merging")
+    
+    # Combine fingerprint indexes in shard order
+    fingerprints = FingerprintIndex.load(FINGERPRINT_INDEX_PATH)
+    for shard_index in range(num_shards):
+        shard_index_data = FingerprintIndex.load(shard_fingerprint_path(shard_index, num_shards))
+        for key, entry in shard_index_data.entries.items():
+            fingerprints.add(key, entry['fingerprint'], entry['features'], entry['duration'], entry['mode'])
+    fingerprints.save(FINGERPRINT_INDEX_PATH)
+    
+    # Unavailable videos found by any shard are skipped by the next unsharded run
+    failure_cache = FailureCache(FAILURE_CACHE_PATH, ttl_days=FAILURE_TTL)
+    for shard_index in range(num_shards):
+        failure_cache.update(FailureCache(shard_failure_cache_path(shard_index, num_shards), ttl_days=FAILURE_TTL))
+    failure_cache.flush()
+    print(f"Merged failure cache: {len(failure_cache)} known unavailable videos")
+    
+    if results:
+        save_results(results)
+    print(f"\nMerged {len(results)} videos from {num_shards} shards")
 
 if __name__ == "__main__":
-    print("\n=== Starting YouTube Video Audio Analysis ===")
-    main()
-    print("\n=== Analysis Process Completed ===\n") 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="YouTube video audio analysis")
+    parser.add_argument('--num-shards', type=int, default=1, help="Total number of shards")
+    parser.add_argument('--shard-index', type=int, help="Process only this shard (0-based)")
+    parser.add_argument('--merge', action='store_true', help="Merge the outputs of all shards")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Download and analyze many videos concurrently")
+    parser.add_argument('--max-downloads', type=int, default=64, help="Downloads in flight with --async")
+    args = parser.parse_args()
+    
+    if args.merge:
+        merge_shards(args.num_shards)
+    else:
+        print("\n=== Starting YouTube Video Audio Analysis ===")
+        main(args.shard_index, args.num_shards, args.use_async, args.max_downloads)
+        print("\n=== Analysis Process Completed ===\n") 
\ No newline at end of file
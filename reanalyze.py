@@ -0,0 +1,63 @@
+import argparse
+import importlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from audio_cache import AudioCache, AUDIO_CACHE_DIR, read_clip
+
+DEFAULT_EXTRACTOR = 'audio_analyzer:extract_features'
+
+def load_extractor(spec: str):
+    """Resolve a 'module:function' extractor taking (y, sr, duration)."""
+    module_name, _, function_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+def analyze_cached_clip(root, entry: dict, extractor_spec: str) -> dict:
+    """Worker entry point: run an extractor on one cached clip."""
+    extractor = load_extractor(extractor_spec)
+    y = read_clip(root, entry)
+    features = extractor(y, entry['sr'], entry['duration'])
+    features['video_id'] = entry['video_id']
+    features['url'] = entry['url']
+    return features
+
+def main():
+    """
+    Re-run feature extraction on the decoded-audio cache.
+
+    No downloads or decoding are needed, so feature experiments are bound
+    by CPU only.
+    """
+    parser = argparse.ArgumentParser(description="Re-analyze cached decoded audio")
+    parser.add_argument('--extractor', default=DEFAULT_EXTRACTOR,
+                        help="module:function taking (y, sr, duration) and returning a dict")
+    parser.add_argument('--cache-dir', default=str(AUDIO_CACHE_DIR))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=str(Path('results') / 'reanalysis_results.json'))
+    args = parser.parse_args()
+
+    cache = AudioCache(args.cache_dir)
+    video_ids = cache.video_ids()
+    print(f"\n=== Re-analyzing {len(video_ids)} cached clips with {args.extractor} ===")
+
+    results = []
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(analyze_cached_clip, cache.root, cache.entry(video_id), args.extractor)
+            for video_id in video_ids
+        ]
+        for video_id, future in zip(video_ids, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failed += 1
+                print(f"✗ Error analyzing {video_id}: {str(e)}")
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f"\nRe-analyzed {len(results)} clips ({failed} failed), saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
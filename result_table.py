@@ -0,0 +1,175 @@
+import json
+import math
+import numpy as np
+import pandas as pd
+from feature_stats import FEATURE_NAMES, N_MFCC
+
+MFCC_KEY = 'mfcc_mean'
+INITIAL_CAPACITY = 1024
+
+class ResultTable:
+    """
+    Feature records of a run stored column by column.
+
+    Numeric features live in preallocated NumPy columns (int64 while all
+    values are integers, float64 otherwise) and MFCC means in one N x 13
+    float32 block. Capacity doubles when full, so appending is amortized
+    O(1). Missing values are NaN for numeric columns and None for strings.
+    """
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self._capacity = max(1, capacity)
+        self._size = 0
+        self._columns = {}  # name -> array, in first-seen order
+        self._mfcc = np.full((self._capacity, N_MFCC), np.nan, dtype=np.float32)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def columns(self) -> list:
+        return list(self._columns) + [MFCC_KEY]
+
+    @classmethod
+    def from_records(cls, records):
+        records = list(records)
+        table = cls(max(len(records), 1))
+        for record in records:
+            table.append(record)
+        return table
+
+    def _new_column(self, value):
+        if isinstance(value, (bool, np.bool_)):
+            dtype = bool
+        elif isinstance(value, (int, np.integer)):
+            dtype = np.int64
+        elif isinstance(value, (float, np.floating)):
+            dtype = np.float64
+        else:
+            dtype = object
+        if self._size:
+            # Earlier rows have no value for this feature
+            dtype = {bool: np.float64, np.int64: np.float64}.get(dtype, dtype)
+        return self._empty(dtype, self._capacity)
+
+    def _fits(self, column: np.ndarray, value) -> bool:
+        if column.dtype == object:
+            return True
+        if value is None:
+            return column.dtype.kind == 'f'
+        if column.dtype == bool:
+            return isinstance(value, (bool, np.bool_))
+        if column.dtype == np.int64:
+            return isinstance(value, (int, np.integer))
+        return isinstance(value, (int, float, np.number))
+
+    def _widen(self, name: str, value) -> None:
+        """Change a column's type so it can hold value (bool/int -> float -> object)."""
+        column = self._columns[name]
+        numeric = value is None or isinstance(value, (int, float, np.number))
+        dtype = np.float64 if numeric and column.dtype != object else object
+        widened = self._empty(dtype, self._capacity)
+        widened[:self._size] = column[:self._size]
+        self._columns[name] = widened
+
+    def _empty(self, dtype, size: int) -> np.ndarray:
+        if dtype == object:
+            return np.full(size, None, dtype=object)
+        if np.dtype(dtype).kind == 'f':
+            return np.full(size, np.nan, dtype=dtype)
+        return np.zeros(size, dtype=dtype)
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        for name, column in self._columns.items():
+            grown = self._empty(column.dtype, self._capacity)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+        mfcc = np.full((self._capacity, N_MFCC), np.nan, dtype=np.float32)
+        mfcc[:self._size] = self._mfcc[:self._size]
+        self._mfcc = mfcc
+
+    def append(self, record: dict) -> None:
+        """Add one feature record (as returned by analyze_audio, plus url and views)."""
+        if self._size == self._capacity:
+            self._grow()
+        row = self._size
+        for name, value in record.items():
+            if name == MFCC_KEY:
+                self._mfcc[row] = value
+                continue
+            if name not in self._columns:
+                self._columns[name] = self._new_column(value)
+            elif not self._fits(self._columns[name], value):
+                self._widen(name, value)
+            self._columns[name][row] = np.nan if value is None and self._columns[name].dtype != object else value
+        # Features this record lacks keep their NaN/None fill, except in
+        # integer columns, which have no missing value
+        for name, column in self._columns.items():
+            if name not in record and column.dtype.kind in 'bi':
+                self._widen(name, 0.0)
+                self._columns[name][row] = np.nan
+        self._size += 1
+
+    def column(self, name: str) -> np.ndarray:
+        """View of one column (N x 13 block for mfcc_mean)."""
+        if name == MFCC_KEY:
+            return self._mfcc[:self._size]
+        return self._columns[name][:self._size]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """DataFrame with one column per feature and mfcc_0..mfcc_12 for the MFCCs."""
+        data = {name: column[:self._size] for name, column in self._columns.items()}
+        for i in range(N_MFCC):
+            data[f'mfcc_{i}'] = self._mfcc[:self._size, i]
+        return pd.DataFrame(data, copy=False)
+
+    def feature_matrix(self) -> np.ndarray:
+        """
+        Rows of FEATURE_NAMES values, for FeatureStatistics.from_matrix.
+
+        Rows with a missing or non-finite feature are dropped, like
+        incomplete records in FeatureStatistics.update.
+        """
+        parts = []
+        for name in FEATURE_NAMES:
+            if name.startswith('mfcc_'):
+                continue
+            if name == 'log_views':
+                parts.append(np.log10(parts[-1] + 1))
+            elif name in self._columns and self._columns[name].dtype != object:
+                parts.append(self._columns[name][:self._size].astype(np.float64))
+            else:
+                parts.append(np.full(self._size, np.nan))
+        matrix = np.column_stack(parts + [self._mfcc[:self._size].astype(np.float64)])
+        return matrix[np.all(np.isfinite(matrix), axis=1)]
+
+    def records(self, chunk_size: int = 4096):
+        """
+        Yield one dict per row in the original record layout (mfcc_mean as
+        a list). Rows are converted chunk by chunk, never all at once.
+        """
+        names = list(self._columns)
+        for start in range(0, self._size, chunk_size):
+            stop = min(start + chunk_size, self._size)
+            columns = [self._columns[name][start:stop].tolist() for name in names]
+            mfcc = self._mfcc[start:stop]
+            for row in range(stop - start):
+                record = {}
+                for name, values in zip(names, columns):
+                    value = values[row]
+                    # Missing features are left out, as in the source record
+                    if value is None or (isinstance(value, float) and math.isnan(value)):
+                        continue
+                    record[name] = value
+                if not np.isnan(mfcc[row, 0]):
+                    record[MFCC_KEY] = mfcc[row].tolist()
+                yield record
+
+    def write_json(self, f, indent: int = 4) -> None:
+        """Write the rows as a JSON list of records, one row at a time."""
+        f.write('[')
+        for row, record in enumerate(self.records()):
+            f.write(',\n' if row else '\n')
+            f.write(json.dumps(record, indent=indent))
+        f.write('\n]' if self._size else ']')
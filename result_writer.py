@@ -1,32 +1,120 @@
-import pandas as pd
 import json
 from pathlib import Path
 import logging
+from data_reader import extract_video_id
+from feature_stats import FeatureStatistics, FEATURE_STATS_PATH
+from result_table import ResultTable
 
 logger = logging.getLogger(__name__)
 
-def save_results(results: list) -> None:
+def save_results(results, feature_stats: FeatureStatistics = None) -> None:
     """
-    Save analysis results to CSV and JSON files.
+    Save analysis results to CSV and JSON files, plus their feature statistics.
     
     Args:
-        results (list): List of dictionaries containing analysis results
+        results (ResultTable or list): Results of the run; a plain list of
+            dictionaries is converted to a ResultTable first
+        feature_stats (FeatureStatistics): Statistics updated as each result
+            arrived (see main.process_videos); computed from the results in
+            one batch if not given, e.g. after merging shards
     """
     try:
-        # Create DataFrame
-        df = pd.DataFrame(results)
+        if not isinstance(results, ResultTable):
+            results = ResultTable.from_records(results)
         
-        # Save to CSV
+        # Save to CSV (MFCCs as mfcc_0..mfcc_12 columns)
         csv_path = Path('results') / 'analysis_results.csv'
-        df.to_csv(csv_path, index=False)
+        results.to_dataframe().to_csv(csv_path, index=False)
         
         # Save to JSON (for better preservation of nested structures)
         json_path = Path('results') / 'analysis_results.json'
         with open(json_path, 'w') as f:
-            json.dump(results, f, indent=4)
+            results.write_json(f, indent=4)
             
-        logger.info(f"Results saved to {csv_path} and {json_path}")
+        # Precomputed means/covariances so readers never rescan the results
+        if feature_stats is None:
+            feature_stats = FeatureStatistics.from_matrix(results.feature_matrix())
+        feature_stats.save(FEATURE_STATS_PATH)
+            
+        logger.info(f"Results saved to {csv_path}, {json_path} and {FEATURE_STATS_PATH}")
         
     except Exception as e:
         logger.error(f"Error saving results: {str(e)}")
-        raise 
\ No newline at end of file
+        raise
+
+SHARDS_DIR = Path('results') / 'shards'
+
+def shard_results_path(shard_index: int, num_shards: int) -> Path:
+    """Path of the partial results written by one shard."""
+    return SHARDS_DIR / f'analysis_results.shard-{shard_index}-of-{num_shards}.json'
+
+def save_shard_results(results, stats: dict, shard_index: int, num_shards: int) -> Path:
+    """
+    Save the partial results and run statistics of one shard.
+    
+    Args:
+        results (ResultTable or list): Results of the shard run
+        stats (dict): Counters of the shard run (videos, successful, ...)
+        shard_index (int): Shard number
+        num_shards (int): Total number of shards
+        
+    Returns:
+        Path: File written
+    """
+    SHARDS_DIR.mkdir(parents=True, exist_ok=True)
+    path = shard_results_path(shard_index, num_shards)
+    # Write to a temporary file first so the merge never sees partial output
+    tmp_path = path.with_suffix('.tmp')
+    if not isinstance(results, ResultTable):
+        results = ResultTable.from_records(results)
+    header = {'shard_index': shard_index, 'num_shards': num_shards, 'stats': stats}
+    with open(tmp_path, 'w') as f:
+        # Same layout as one json.dump, but the results are written row by row
+        f.write('{\n')
+        for key, value in header.items():
+            f.write(f'    {json.dumps(key)}: {json.dumps(value)},\n')
+        f.write('    "results": ')
+        results.write_json(f, indent=4)
+        f.write('\n}\n')
+    tmp_path.replace(path)
+    logger.info(f"Shard results saved to {path}")
+    return path
+
+def merge_shard_results(num_shards: int):
+    """
+    Combine the partial outputs of all shards.
+    
+    Records are deduplicated by video ID (the lowest shard wins) and sorted
+    by views, then video ID, so the merged output does not depend on which
+    shard finished first.
+    
+    Args:
+        num_shards (int): Total number of shards of the run
+        
+    Returns:
+        tuple: (merged results list, per-shard statistics dict)
+    """
+    merged = {}
+    shard_stats = {}
+    for shard_index in range(num_shards):
+        path = shard_results_path(shard_index, num_shards)
+        if not path.exists():
+            shard_stats[shard_index] = {'missing': True}
+            continue
+        with open(path, 'r') as f:
+            shard = json.load(f)
+        
+        stats = dict(shard['stats'])
+        stats['records'] = len(shard['results'])
+        stats['duplicates_removed'] = 0
+        for record in shard['results']:
+            video_id = extract_video_id(record['url'])
+            if video_id in merged:
+                stats['duplicates_removed'] += 1
+            else:
+                merged[video_id] = record
+        shard_stats[shard_index] = stats
+    
+    results = sorted(merged.values(), key=lambda r: (-r['views'], extract_video_id(r['url'])))
+    return results, shard_stats
+
@@ -1,8 +1,7 @@
 from visualizer import app
 import os
-import json
 import pandas as pd
-from datetime import datetime
+from analysis_store import save_analysis, scalar_features, ADVANCED_RESULTS_DIR
 
 if __name__ == '__main__':
     # Get port from environment variable or use default
@@ -15,19 +14,15 @@ if __name__ == '__main__':
         debug=False  # Set to False in production
     ) 
 
-def export_advanced_analysis(analysis_results):
-    # Export detailed JSON results
-    with open('results/analysis_results.json', 'w') as f:
-        json.dump({
-            'audio_features': analysis_results['features'],
-            'patterns': analysis_results['patterns'],
-            'temporal_analysis': analysis_results['temporal'],
-            'metadata': {
-                'analysis_version': '2.0',
-                'timestamp': datetime.now().isoformat()
-            }
-        }, f, indent=2)
-    
-    # Export CSV for easier statistical analysis
-    df = pd.DataFrame(analysis_results['features'])
-    df.to_csv('results/analysis_results.csv', index=False) 
\ No newline at end of file
+def export_advanced_analysis(analysis_results, video_id):
+    # Scalars go to JSON metadata, frame-level series to memory-mappable blocks
+    save_analysis(video_id, analysis_results)
+
+def export_features_csv():
+    """
+    Export a CSV of the scalar features of every stored video, for easier
+    statistical analysis. Reads all metadata files, so call it once after
+    a batch of exports rather than per video.
+    """
+    df = pd.DataFrame(scalar_features())
+    df.to_csv(ADVANCED_RESULTS_DIR / 'features.csv', index=False)
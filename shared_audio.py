@@ -0,0 +1,153 @@
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+import os
+import numpy as np
+from audio_analyzer import MAX_DURATION, extract_features
+from fingerprint import compute_fingerprint
+from lazy_imports import lazy_import
+
+librosa = lazy_import('librosa')
+
+@dataclass(frozen=True)
+class SharedAudio:
+    """Picklable handle to decoded audio held in a shared memory segment."""
+    name: str
+    length: int
+    sr: int
+    duration: float
+    dtype: str = 'float32'
+
+def _attach_segment(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without taking ownership of it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no track argument
+        return shared_memory.SharedMemory(name=name)
+
+def publish_audio(audio_path: str, max_duration: float = MAX_DURATION) -> SharedAudio:
+    """
+    Decode an audio file into a new shared memory segment.
+
+    The caller owns the segment and must call release_audio once the
+    analysis job has finished or failed.
+
+    Args:
+        audio_path (str): Path to audio file
+        max_duration (float): Seconds to decode (None for the full file)
+
+    Returns:
+        SharedAudio: Handle that can be sent to worker processes
+    """
+    duration = librosa.get_duration(path=audio_path)
+    y, sr = librosa.load(audio_path, mono=True, duration=max_duration)
+    y = y.astype(np.float32, copy=False)
+
+    segment = shared_memory.SharedMemory(create=True, size=max(y.nbytes, 1))
+    try:
+        np.ndarray(y.shape, dtype=y.dtype, buffer=segment.buf)[:] = y
+        return SharedAudio(segment.name, len(y), sr, float(duration), str(y.dtype))
+    except Exception:
+        segment.unlink()
+        raise
+    finally:
+        segment.close()
+
+def release_audio(handle: SharedAudio) -> None:
+    """Free the shared memory segment behind a handle."""
+    try:
+        segment = _attach_segment(handle.name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
+
+@contextmanager
+def attach_audio(handle: SharedAudio):
+    """
+    Map a published segment as a read-only NumPy array without copying.
+
+    The array must not be used after the context exits.
+    """
+    segment = _attach_segment(handle.name)
+    y = None
+    try:
+        y = np.ndarray((handle.length,), dtype=handle.dtype, buffer=segment.buf)
+        y.flags.writeable = False
+        yield y
+    finally:
+        del y
+        segment.close()
+
+def analyze_shared_audio(handle: SharedAudio, include_melodic: bool = False,
+                         tempo_mode: str = 'beat_track') -> dict:
+    """Worker entry point: extract features from a published segment."""
+    with attach_audio(handle) as y:
+        return extract_features(y, handle.sr, handle.duration, include_melodic, tempo_mode)
+
+def fingerprint_shared_audio(handle: SharedAudio) -> np.ndarray:
+    """Worker entry point: fingerprint a published segment."""
+    with attach_audio(handle) as y:
+        return compute_fingerprint(y, handle.sr)
+
+def analyze_files_parallel(audio_paths, max_workers: int = None, include_melodic: bool = False,
+                           tempo_mode: str = 'beat_track', initializer=None):
+    """
+    Analyze audio files in worker processes with a shared memory handoff.
+
+    Decoding happens in this process; workers attach to the decoded
+    segments, so no audio is pickled. At most twice max_workers clips are
+    held in memory at once, and each segment is released as soon as its
+    job finishes or fails.
+
+    Args:
+        audio_paths (iterable): Paths of audio files to analyze
+        max_workers (int): Number of analysis processes
+        include_melodic (bool): Also compute pitch statistics
+        tempo_mode (str): 'beat_track' or 'fast' (see extract_features)
+        initializer (callable): Run once in each worker process
+
+    Yields:
+        tuple: (audio_path, features dict or the raised exception)
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_in_flight = 2 * max_workers
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=initializer) as pool:
+        pending = {}
+
+        def drain(return_when):
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                path, handle = pending.pop(future)
+                try:
+                    yield path, future.result()
+                except Exception as e:
+                    yield path, e
+                finally:
+                    release_audio(handle)
+
+        try:
+            for path in audio_paths:
+                try:
+                    handle = publish_audio(path)
+                except Exception as e:
+                    yield path, e
+                    continue
+                try:
+                    future = pool.submit(analyze_shared_audio, handle, include_melodic, tempo_mode)
+                except Exception:
+                    release_audio(handle)
+                    raise
+                pending[future] = (path, handle)
+                if len(pending) >= max_in_flight:
+                    yield from drain(FIRST_COMPLETED)
+            while pending:
+                yield from drain(FIRST_COMPLETED)
+        finally:
+            # Generator closed early or pool failed: cancel and free everything
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            for _, handle in pending.values():
+                release_audio(handle)
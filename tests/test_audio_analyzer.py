@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip('librosa')
+from audio_analyzer import extract_features
+
+SR = 22050
+
+def _click_track(bpm=120, seconds=10):
+    times = np.arange(0, seconds, 60 / bpm)
+    return librosa.clicks(times=times, sr=SR, length=seconds * SR).astype(np.float32)
+
+@pytest.mark.parametrize('tempo_mode', ['beat_track', 'fast'])
+def test_tempo_is_a_float(tempo_mode):
+    features = extract_features(_click_track(), SR, 10.0, tempo_mode=tempo_mode)
+    assert type(features['tempo']) is float
+    assert features['tempo'] == pytest.approx(120, rel=0.05)
@@ -0,0 +1,55 @@
+import numpy as np
+from audio_cache import AudioCache
+
+SR = 100
+
+def _clip(value, length=100):
+    return np.full(length, value, dtype=np.float32)
+
+def test_least_recently_used_clip_is_evicted(tmp_path):
+    # Room for two 100-sample int16 clips
+    cache = AudioCache(tmp_path, max_bytes=400)
+    cache.put('a', _clip(0.1), SR, 1.0)
+    cache.put('b', _clip(0.2), SR, 1.0)
+    cache.get('a')
+    cache.put('c', _clip(0.3), SR, 1.0)
+    assert cache.video_ids() == ['a', 'c']
+    assert cache.total_bytes == 400
+    assert len(list(tmp_path.glob('*.pcm'))) == 2
+
+def test_oversized_clip_is_not_stored(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=100)
+    cache.put('a', _clip(0.1), SR, 1.0)
+    assert 'a' not in cache and cache.total_bytes == 0
+
+def test_roundtrip(tmp_path):
+    cache = AudioCache(tmp_path)
+    y = np.linspace(-1, 1, 1000, dtype=np.float32)
+    cache.put('a', y, 22050, 30.0, 'https://youtu.be/a')
+    clip, sr, duration = cache.get('a')
+    assert np.allclose(clip, y, atol=1e-4)
+    assert (sr, duration) == (22050, 30.0)
+    assert cache.entry('a')['url'] == 'https://youtu.be/a'
+
+def test_flush_and_reload_keep_lru_order(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=600)
+    for video_id in 'abc':
+        cache.put(video_id, _clip(0.5), SR, 1.0)
+    cache.get('a')
+    cache.flush()
+
+    reloaded = AudioCache(tmp_path, max_bytes=600)
+    assert reloaded.video_ids() == ['b', 'c', 'a']
+    assert reloaded.total_bytes == 600
+    reloaded.put('d', _clip(0.5), SR, 1.0)
+    assert reloaded.video_ids() == ['c', 'a', 'd']
+
+def test_unflushed_clips_are_dropped_on_reload(tmp_path):
+    cache = AudioCache(tmp_path)
+    cache.put('a', _clip(0.5), SR, 1.0)
+    cache.flush()
+    cache.put('b', _clip(0.5), SR, 1.0)
+
+    reloaded = AudioCache(tmp_path)
+    assert reloaded.video_ids() == ['a']
+    assert len(list(tmp_path.glob('*.pcm'))) == 1
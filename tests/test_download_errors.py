@@ -0,0 +1,25 @@
+import pytest
+yt_dlp_utils = pytest.importorskip('yt_dlp.utils')
+from video_processor import is_permanent_failure
+
+def download_error(message):
+    return yt_dlp_utils.DownloadError(f"ERROR: [youtube] abc: {message}")
+
+@pytest.mark.parametrize('message', [
+    "Private video. Sign in if you've been granted access to this video",
+    "Video unavailable. This video has been removed by the uploader",
+    "Video unavailable. This video is not available in your country",
+])
+def test_permanent_failures(message):
+    assert is_permanent_failure(download_error(message))
+
+@pytest.mark.parametrize('message', [
+    "Video unavailable. This content isn't available, try again later.",
+    "Video unavailable",
+    "unable to download video data: HTTP Error 429: Too Many Requests",
+])
+def test_transient_failures(message):
+    assert not is_permanent_failure(download_error(message))
+
+def test_non_yt_dlp_errors_are_transient():
+    assert not is_permanent_failure(OSError("Private video"))
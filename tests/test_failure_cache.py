@@ -0,0 +1,39 @@
+import json
+import time
+import pytest
+from failure_cache import FailureCache
+
+def test_entries_expire(tmp_path):
+    path = tmp_path / 'failed.json'
+    path.write_text(json.dumps({
+        'old': {'reason': 'Private video', 'failed_at': time.time() - 40 * 24 * 3600},
+        'new': {'reason': 'Private video', 'failed_at': time.time()}
+    }))
+    cache = FailureCache(path, ttl_days=30)
+    assert 'new' in cache and 'old' not in cache
+
+def test_update_keeps_latest_failure(tmp_path):
+    first = FailureCache(tmp_path / 'a.json')
+    second = FailureCache(tmp_path / 'b.json')
+    first.add('x', 'Video unavailable')
+    second.add('x', 'Private video')
+    second.add('y', 'Private video')
+    first.update(second)
+    assert len(first) == 2
+    assert first.reason('x') == 'Private video'
+    first.flush()
+    assert FailureCache(tmp_path / 'a.json').reason('y') == 'Private video'
+
+def test_merge_shards_folds_failure_caches(tmp_path, monkeypatch):
+    main = pytest.importorskip('main')
+    monkeypatch.chdir(tmp_path)
+    for shard_index, url in enumerate(['https://youtu.be/a', 'https://youtu.be/b']):
+        main.save_shard_results([], {'videos': 1, 'successful': 0, 'failed': 1, 'duplicates': 0},
+                                shard_index, 2)
+        cache = FailureCache(main.shard_failure_cache_path(shard_index, 2))
+        cache.add(url, 'Private video')
+        cache.flush()
+
+    main.merge_shards(2)
+    merged = FailureCache(main.FAILURE_CACHE_PATH)
+    assert 'https://youtu.be/a' in merged and 'https://youtu.be/b' in merged
@@ -0,0 +1,51 @@
+import time
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip('librosa')
+from fingerprint import FINGERPRINT_SR, FingerprintIndex, compute_fingerprint
+
+SR = 22050
+MODE = 'window/beat_track/basic'
+
+def _track(seed, seconds=15, silent_intro=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * SR) / SR
+    y = rng.standard_normal(len(t)) * (0.5 + 0.4 * np.sin(2 * np.pi * 3 * t))
+    y[:silent_intro * SR] = 0
+    return (0.1 * y).astype(np.float32)
+
+def _reencode(y, seed):
+    # Lower volume, resample round trip and a little noise
+    noise = np.random.default_rng(seed).standard_normal(len(y)).astype(np.float32)
+    y = librosa.resample(0.7 * y, orig_sr=SR, target_sr=16000)
+    return librosa.resample(y, orig_sr=16000, target_sr=SR)[:len(noise)] + 0.002 * noise
+
+
+def test_reencoded_track_matches():
+    index = FingerprintIndex()
+    original = _track(0)
+    index.add('original', compute_fingerprint(original, SR), {'duration': 15.0}, 15.0, MODE)
+    index.add('other', compute_fingerprint(_track(1), SR), {'duration': 15.0}, 15.0, MODE)
+    match = index.match(compute_fingerprint(_reencode(original, 2), SR), 15.0, MODE)
+    assert match is not None and match['key'] == 'original'
+
+def test_silent_intro_does_not_match():
+    index = FingerprintIndex()
+    index.add('a', compute_fingerprint(_track(0, silent_intro=10), SR), {'duration': 15.0}, 15.0, MODE)
+    assert index.match(compute_fingerprint(_track(1, silent_intro=10), SR), 15.0, MODE) is None
+    silence = np.zeros(15 * FINGERPRINT_SR, dtype=np.float32)
+    assert index.match(compute_fingerprint(silence, FINGERPRINT_SR), 15.0, MODE) is None
+
+def test_silent_intros_keep_matching_fast():
+    rng = np.random.default_rng(0)
+    index = FingerprintIndex()
+    for i in range(2000):
+        fingerprint = rng.integers(1, 2**32 - 1, 320, dtype=np.uint32)
+        fingerprint[:110] = 0  # 5 s silent intro
+        index.add(f'video-{i}', fingerprint, {'duration': 15.0}, 15.0, MODE)
+    query = rng.integers(1, 2**32 - 1, 320, dtype=np.uint32)
+    query[:110] = 0
+    start = time.perf_counter()
+    assert index.match(query, 15.0, MODE) is None
+    assert time.perf_counter() - start < 1.0
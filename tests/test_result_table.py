@@ -0,0 +1,62 @@
+import io
+import json
+import numpy as np
+from feature_stats import FEATURE_NAMES, N_MFCC
+from result_table import ResultTable
+
+def _record(i, **extra):
+    record = {'url': f'https://youtu.be/v{i}', 'views': 10 * i, 'duration': 60.0 + i, 'tempo': 120.0,
+              'spectral_centroid_mean': 1500.0, 'zcr_mean': 0.05, 'onset_strength_mean': 1.2,
+              'mfcc_mean': [float(i)] * N_MFCC}
+    record.update(extra)
+    return record
+
+def test_append_grows_and_keeps_rows():
+    table = ResultTable(capacity=2)
+    for i in range(5):
+        table.append(_record(i))
+    assert len(table) == 5
+    assert table.column('views').dtype == np.int64
+    assert table.column('views').tolist() == [0, 10, 20, 30, 40]
+    assert table.column('mfcc_mean').shape == (5, N_MFCC)
+    assert table.column('url')[4] == 'https://youtu.be/v4'
+
+def test_column_widens_from_int_to_float_to_object():
+    table = ResultTable()
+    table.append({'value': 1})
+    assert table.column('value').dtype == np.int64
+    table.append({'value': 2.5})
+    assert table.column('value').dtype == np.float64
+    table.append({'value': 'n/a'})
+    assert table.column('value').dtype == object
+    assert table.column('value').tolist() == [1.0, 2.5, 'n/a']
+
+def test_missing_values():
+    table = ResultTable()
+    table.append({'views': 1, 'title': 'a'})
+    table.append({'tempo': 100.0})
+    assert table.column('views').dtype == np.float64
+    assert np.isnan(table.column('views')[1])
+    assert table.column('title').tolist() == ['a', None]
+    assert np.isnan(table.column('tempo')[0])
+    assert list(table.records()) == [{'views': 1.0, 'title': 'a'}, {'tempo': 100.0}]
+
+def test_records_roundtrip_in_chunks():
+    records = [_record(i) for i in range(7)]
+    table = ResultTable.from_records(records)
+    assert list(table.records(chunk_size=3)) == records
+
+def test_write_json():
+    records = [_record(i) for i in range(3)]
+    f = io.StringIO()
+    ResultTable.from_records(records).write_json(f)
+    assert json.loads(f.getvalue()) == records
+    f = io.StringIO()
+    ResultTable().write_json(f)
+    assert json.loads(f.getvalue()) == []
+
+def test_feature_matrix_drops_incomplete_rows():
+    table = ResultTable.from_records([_record(1), _record(2, tempo=None), _record(3)])
+    matrix = table.feature_matrix()
+    assert matrix.shape == (2, len(FEATURE_NAMES))
+    assert matrix[:, -1].tolist() == [1.0, 3.0]
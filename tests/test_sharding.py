@@ -0,0 +1,70 @@
+import json
+import pandas as pd
+import pytest
+import result_writer
+from data_reader import extract_video_id, select_shard
+from result_writer import merge_shard_results, save_shard_results
+from result_table import ResultTable
+
+@pytest.fixture
+def shards_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_writer, 'SHARDS_DIR', tmp_path / 'shards')
+    return tmp_path / 'shards'
+
+def _record(video_id, views, url=None):
+    return {'url': url or f'https://www.youtube.com/watch?v={video_id}', 'views': views, 'tempo': 120.0}
+
+def test_shards_are_disjoint_and_cover_the_manifest():
+    df = pd.DataFrame({
+        'url': [f'https://www.youtube.com/watch?v=vid{i:05d}' for i in range(500)],
+        'views': range(500)
+    })
+    for num_shards in (1, 3, 8):
+        shards = [select_shard(df, i, num_shards) for i in range(num_shards)]
+        indices = [index for shard in shards for index in shard.index]
+        assert sorted(indices) == list(df.index)
+        assert all(len(shard) for shard in shards)
+
+def test_same_video_lands_in_same_shard_for_any_url_form():
+    df = pd.DataFrame({'url': ['https://www.youtube.com/watch?v=abc123XYZ_0',
+                               'https://youtu.be/abc123XYZ_0',
+                               'https://www.youtube.com/shorts/abc123XYZ_0'],
+                       'views': [1, 2, 3]})
+    for i in range(4):
+        assert len(select_shard(df, i, 4)) in (0, 3)
+
+def test_invalid_shard_index():
+    with pytest.raises(ValueError):
+        select_shard(pd.DataFrame({'url': []}), 2, 2)
+
+def test_merge_shard_results(shards_dir):
+    stats = {'videos': 2, 'successful': 2, 'failed': 0}
+    save_shard_results([_record('aaa', 10), _record('bbb', 30)], stats, 0, 3)
+    # Shard 2 saw video aaa under its short URL form
+    save_shard_results([_record('ccc', 20), _record('aaa', 10, 'https://youtu.be/aaa')], stats, 2, 3)
+
+    results, shard_stats = merge_shard_results(3)
+    assert [extract_video_id(r['url']) for r in results] == ['bbb', 'ccc', 'aaa']
+    # The lowest shard's record wins
+    assert results[-1]['url'] == 'https://www.youtube.com/watch?v=aaa'
+    assert shard_stats[1] == {'missing': True}
+    assert shard_stats[0]['duplicates_removed'] == 0
+    assert shard_stats[2]['duplicates_removed'] == 1
+    assert shard_stats[2]['records'] == 2
+    assert not list(shards_dir.glob('*.tmp'))
+
+def test_merge_shard_results_is_order_independent(shards_dir):
+    stats = {'videos': 1}
+    save_shard_results([_record('bbb', 5)], stats, 1, 2)
+    save_shard_results([_record('aaa', 5)], stats, 0, 2)
+    results, _ = merge_shard_results(2)
+    assert [extract_video_id(r['url']) for r in results] == ['aaa', 'bbb']
+
+def test_shard_file_from_result_table(shards_dir):
+    records = [_record('aaa', 10), _record('bbb', 30)]
+    path = save_shard_results(ResultTable.from_records(records), {'videos': 2}, 0, 1)
+    with open(path) as f:
+        shard = json.load(f)
+    assert shard == {'shard_index': 0, 'num_shards': 1, 'stats': {'videos': 2}, 'results': records}
+    save_shard_results(ResultTable(), {'videos': 0}, 0, 1)
+    assert merge_shard_results(1)[0] == []
@@ -0,0 +1,53 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pytest
+
+sf = pytest.importorskip('soundfile')
+pytest.importorskip('librosa')
+from shared_audio import analyze_files_parallel, publish_audio, release_audio
+
+SHM_DIR = '/dev/shm'
+pytestmark = pytest.mark.skipif(not os.path.isdir(SHM_DIR), reason="no /dev/shm")
+
+def _segments():
+    return {name for name in os.listdir(SHM_DIR) if name.startswith('psm_')}
+
+def _write_tone(path, seconds=3, sr=22050):
+    t = np.arange(seconds * sr) / sr
+    sf.write(path, (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32), sr)
+    return str(path)
+
+def _broken_worker():
+    raise RuntimeError("worker failed to start")
+
+def test_publish_and_release(tmp_path):
+    before = _segments()
+    handle = publish_audio(_write_tone(tmp_path / 'tone.wav'))
+    assert handle.name.lstrip('/') in _segments()
+    release_audio(handle)
+    assert _segments() == before
+
+def test_parallel_analysis_releases_segments(tmp_path):
+    before = _segments()
+    good = _write_tone(tmp_path / 'tone.wav')
+    missing = str(tmp_path / 'missing.wav')
+    results = dict(analyze_files_parallel([good, missing], max_workers=2, tempo_mode='fast'))
+    assert results[good]['duration'] == pytest.approx(3, abs=0.1)
+    assert isinstance(results[missing], Exception)
+    assert _segments() == before
+
+def test_failed_workers_release_segments(tmp_path):
+    before = _segments()
+    paths = [_write_tone(tmp_path / f'tone{i}.wav') for i in range(3)]
+    with pytest.raises(BrokenProcessPool):
+        list(analyze_files_parallel(paths, max_workers=1, initializer=_broken_worker))
+    assert _segments() == before
+
+def test_closing_early_releases_segments(tmp_path):
+    before = _segments()
+    paths = [_write_tone(tmp_path / f'tone{i}.wav') for i in range(4)]
+    results = analyze_files_parallel(paths, max_workers=1, tempo_mode='fast')
+    next(results)
+    results.close()
+    assert _segments() == before
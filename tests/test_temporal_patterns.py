@@ -0,0 +1,17 @@
+import numpy as np
+from video_processor import _estimate_period, analyze_temporal_patterns
+
+def test_estimate_period_of_sine():
+    t = np.arange(1024)
+    assert _estimate_period(np.sin(2 * np.pi * t / 64)) == 64
+
+def test_estimate_period_of_flat_series():
+    assert _estimate_period(np.ones(256)) == 0
+
+def test_loudness_swell_period():
+    sr = 22050
+    t = np.arange(60 * sr) / sr
+    noise = np.random.default_rng(0).standard_normal(len(t))
+    y = ((0.3 + 0.25 * np.sin(2 * np.pi * t / 10)) * 0.5 * noise).astype(np.float32)
+    result = analyze_temporal_patterns(y, sr)
+    assert abs(result['period_seconds'] - 10) < 0.5
@@ -1,15 +1,16 @@
 from pathlib import Path
-import yt_dlp
 import time
 import subprocess
 import os
 import gc
 import shutil
-import librosa
 import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from statsmodels.tsa.seasonal import seasonal_decompose
+from lazy_imports import lazy_import
+
+# Heavy stacks load on first use, so download-only and analysis-only
+# workers do not import each other's dependencies
+yt_dlp = lazy_import('yt_dlp')
+librosa = lazy_import('librosa')
 
 def get_free_space(path: str) -> float:
     """Return free space in GB."""
@@ -25,10 +26,12 @@ def cleanup_files(file_path: str):
     except Exception as e:
         print(f"Error cleaning up file {file_path}: {str(e)}")
 
-def cleanup_downloads_folder():
+DOWNLOADS_DIR = "downloads"
+
+def cleanup_downloads_folder(downloads_dir: str = DOWNLOADS_DIR):
     """Clean up all files in downloads folder."""
     try:
-        downloads_path = Path("downloads")
+        downloads_path = Path(downloads_dir)
         if downloads_path.exists():
             for file in downloads_path.glob("*"):
                 cleanup_files(str(file))
@@ -36,21 +39,24 @@ def cleanup_downloads_folder():
     except Exception as e:
         print(f"Error cleaning up downloads folder: {str(e)}")
 
+def wav_conversion_command(input_path: str, output_path: str) -> list:
+    """ffmpeg command converting a file to WAV with lower quality to save space."""
+    return [
+        'ffmpeg', '-i', input_path,
+        '-acodec', 'pcm_s16le',  # Use standard WAV codec
+        '-ar', '22050',          # Lower sample rate (was 44100)
+        '-ac', '1',              # Mono
+        '-y',                    # Overwrite output file
+        output_path
+    ]
+
 def convert_to_wav(input_path: str) -> str:
     """Convert audio file to WAV format using ffmpeg."""
     try:
         output_path = str(Path(input_path).with_suffix('.wav'))
         print("Converting audio to WAV format...")
         
-        # Run ffmpeg to convert the file with lower quality to save space
-        subprocess.run([
-            'ffmpeg', '-i', input_path,
-            '-acodec', 'pcm_s16le',  # Use standard WAV codec
-            '-ar', '22050',          # Lower sample rate (was 44100)
-            '-ac', '1',              # Mono
-            '-y',                    # Overwrite output file
-            output_path
-        ], check=True, capture_output=True)
+        subprocess.run(wav_conversion_command(input_path, output_path), check=True, capture_output=True)
         
         # Remove the original file
         cleanup_files(input_path)
@@ -65,70 +71,149 @@ def convert_to_wav(input_path: str) -> str:
         cleanup_files(input_path)
         return None
 
-def download_audio(url: str, max_retries: int = 3) -> str:
+def ydl_options(downloads_dir: str = DOWNLOADS_DIR) -> dict:
+    """yt-dlp options for downloading the audio stream only."""
+    return {
+        'format': 'worstaudio',  # Use lowest quality audio to save space
+        'outtmpl': f'{downloads_dir}/%(id)s.%(ext)s',
+        'quiet': True,
+        'no_warnings': True,
+        'extract_audio': True,
+        'postprocessors': [],
+        'http_headers': {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+    }
+
+# yt-dlp messages of failures that retrying cannot fix. YouTube prefixes
+# throttling replies with "Video unavailable" too, so only the specific
+# reasons are listed, never the generic prefix
+PERMANENT_ERROR_PATTERNS = (
+    'private video',
+    'this video is private',
+    'has been removed by the uploader',
+    'removed for violating',
+    'this video has been removed',
+    'has been terminated',
+    'is no longer available',
+    'not available in your country',
+    'blocked it in your country',
+    'copyright claim',
+    'members-only',
+    'join this channel',
+    'confirm your age',
+    'unsupported url',
+    'is not a valid url',
+    'incomplete youtube id',
+)
+
+# Messages that mark a failure as transient even if a pattern above matches
+TRANSIENT_ERROR_PATTERNS = (
+    'try again later',
+)
+
+def is_permanent_failure(error: Exception) -> bool:
+    """
+    Classify a download error: True if retrying cannot succeed.
+    
+    Geo-restricted and unsupported URLs are recognised by their yt-dlp
+    error class, other permanent failures by the error message. Network
+    errors, throttling ("try again later") and anything unrecognised are
+    treated as transient.
+    """
+    if 'yt_dlp' not in type(error).__module__:
+        return False
+    message = str(error).lower()
+    if any(pattern in message for pattern in TRANSIENT_ERROR_PATTERNS):
+        return False
+    # DownloadError wraps the extractor error that caused it
+    cause = getattr(error, 'exc_info', None)
+    cause = cause[1] if cause else error
+    if isinstance(cause, (yt_dlp.utils.GeoRestrictedError, yt_dlp.utils.UnsupportedError)):
+        return True
+    return any(pattern in message for pattern in PERMANENT_ERROR_PATTERNS)
+
+def fetch_audio(url: str, downloads_dir: str = DOWNLOADS_DIR) -> str:
+    """
+    Download the audio stream of a video with yt-dlp (single attempt).
+    
+    Args:
+        url (str): YouTube video URL
+        downloads_dir (str): Folder for temporary audio files
+        
+    Returns:
+        str: Path to downloaded audio file (raises on failure)
+    """
+    # Create downloads directory if it doesn't exist
+    Path(downloads_dir).mkdir(exist_ok=True)
+    
+    with yt_dlp.YoutubeDL(ydl_options(downloads_dir)) as ydl:
+        info = ydl.extract_info(url, download=True)
+        video_id = info['id']
+        ext = info['ext']
+        title = info.get('title', 'Unknown Title')
+        duration = info.get('duration', 'Unknown')
+    
+    audio_path = str(Path(downloads_dir) / f"{video_id}.{ext}")
+    print(f"""
+Downloaded successfully:
+- Title: {title}
+- Duration: {duration} seconds
+- Format: {ext}
+    """)
+    return audio_path
+
+def download_audio(url: str, max_retries: int = 3, downloads_dir: str = DOWNLOADS_DIR,
+                   failure_cache=None) -> str:
     """
     Download audio from YouTube video using yt-dlp without FFmpeg.
     
     Args:
         url (str): YouTube video URL
         max_retries (int): Maximum number of retry attempts
+        downloads_dir (str): Folder for temporary audio files
+        failure_cache (FailureCache): Optional cache of permanently failing
+            URLs; cached URLs are skipped and new permanent failures added
         
     Returns:
         str: Path to downloaded audio file
     """
+    if failure_cache is not None and url in failure_cache:
+        print(f"Skipping known unavailable video: {failure_cache.reason(url)}")
+        return None
+    
     # Check available disk space (need at least 500MB)
     MIN_SPACE_GB = 0.5
     if get_free_space(".") < MIN_SPACE_GB:
         print(f"Low disk space! Cleaning up downloads folder...")
-        cleanup_downloads_folder()
+        cleanup_downloads_folder(downloads_dir)
         if get_free_space(".") < MIN_SPACE_GB:
             print(f"Error: Insufficient disk space (need at least {MIN_SPACE_GB}GB free)")
             return None
     
-    ydl_opts = {
-        'format': 'worstaudio',  # Use lowest quality audio to save space
-        'outtmpl': 'downloads/%(id)s.%(ext)s',
-        'quiet': True,
-        'no_warnings': True,
-        'extract_audio': True,
-        'postprocessors': [],
-        'http_headers': {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-    }
-    
     audio_path = None
     wav_path = None
     
     for attempt in range(max_retries):
         try:
-            # Create downloads directory if it doesn't exist
-            Path("downloads").mkdir(exist_ok=True)
-            
             # Download the audio
             print(f"Download attempt {attempt + 1}/{max_retries}")
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=True)
-                video_id = info['id']
-                ext = info['ext']
-                title = info.get('title', 'Unknown Title')
-                duration = info.get('duration', 'Unknown')
-                
-                audio_path = str(Path('downloads') / f"{video_id}.{ext}")
-                print(f"""
-Downloaded successfully:
-- Title: {title}
-- Duration: {duration} seconds
-- Format: {ext}
-                """)
-                
-                # Convert to WAV format
-                wav_path = convert_to_wav(audio_path)
-                if wav_path:
-                    return wav_path
-                return None
+            audio_path = fetch_audio(url, downloads_dir)
+            
+            # Convert to WAV format
+            wav_path = convert_to_wav(audio_path)
+            if wav_path:
+                return wav_path
+            return None
                 
         except Exception as e:
+            if is_permanent_failure(e):
+                print(f"Video permanently unavailable, not retrying")
+                if failure_cache is not None:
+                    failure_cache.add(url, str(e))
+                cleanup_files(audio_path)
+                cleanup_files(wav_path)
+                return None
             if attempt < max_retries - 1:
                 wait_time = 2 ** attempt
                 print(f"Download failed. Retrying in {wait_time} seconds...")
@@ -175,6 +260,9 @@ def calculate_tempo_stability(audio_data):
     return np.std(tempos)  # Lower value indicates more stable tempo
 
 def identify_song_patterns(songs_data):
+    from sklearn.cluster import KMeans
+    from sklearn.preprocessing import StandardScaler
+    
     # Prepare feature matrix
     features_matrix = []
     for song in songs_data:
@@ -196,17 +284,111 @@ def identify_song_patterns(songs_data):
     
     return clusters, kmeans.cluster_centers_
 
-def analyze_temporal_patterns(audio_data):
-    # Convert audio data to time series
-    rms_energy = librosa.feature.rms(y=audio_data)[0]
+TEMPORAL_RESOLUTION = 512  # Points kept from the energy envelope
+ENVELOPE_HOP = 512
+
+def _energy_envelope(audio_data, hop_length=ENVELOPE_HOP, block_hops=4096):
+    """RMS envelope (frame = 4 hops) computed block by block to bound memory."""
+    n_hops = len(audio_data) // hop_length
+    energy = np.zeros(n_hops)
+    if n_hops == 0:
+        return energy
+    step = hop_length * block_hops
+    for start in range(0, n_hops * hop_length, step):
+        stop = min(start + step, n_hops * hop_length)
+        frames = np.asarray(audio_data[start:stop], dtype=np.float64).reshape(-1, hop_length)
+        energy[start // hop_length:stop // hop_length] = np.einsum('ij,ij->i', frames, frames)
+    frame_energy = np.convolve(energy, np.ones(4), mode='same')
+    return np.sqrt(frame_energy / (4 * hop_length))
+
+def _downsample_envelope(envelope, n_points):
+    """Average an envelope into at most n_points equal-width bins."""
+    if len(envelope) <= n_points:
+        return envelope.astype(float), 1.0
+    edges = np.linspace(0, len(envelope), n_points + 1).astype(int)
+    binned = np.add.reduceat(envelope, edges[:-1]) / np.diff(edges)
+    return binned, len(envelope) / n_points
+
+def _moving_average(series, window):
+    """Centered moving average with edge padding (same length as input)."""
+    window = max(1, int(window)) | 1  # Odd window keeps the average centered
+    if window == 1:
+        return series.copy()
+    padded = np.pad(series, window // 2, mode='edge')
+    return np.convolve(padded, np.ones(window) / window, mode='valid')
+
+def _estimate_period(series, min_period=2):
+    """
+    Estimate the dominant period from the FFT autocorrelation, or 0 if none.
     
-    # Perform seasonal decomposition
-    decomposition = seasonal_decompose(rms_energy, period=len(rms_energy)//8)
+    Only lags after the first zero crossing of the autocorrelation are
+    searched: before it, any smooth series correlates with itself and the
+    smallest lag would always win.
+    """
+    n = len(series)
+    max_period = n // 2
+    if max_period <= min_period:
+        return 0
+    centered = series - series.mean()
+    spectrum = np.fft.rfft(centered, n=2 * n)
+    acf = np.fft.irfft(spectrum * np.conj(spectrum))[:n]
+    if acf[0] <= 0:
+        return 0
+    acf = acf / acf[0]
+    crossings = np.flatnonzero(acf[1:max_period + 1] <= 0)
+    if len(crossings) == 0:
+        return 0
+    start = max(min_period, int(crossings[0]) + 2)
+    if start > max_period:
+        return 0
+    period = int(np.argmax(acf[start:max_period + 1])) + start
+    return period if acf[period] > 0 else 0
+
+def analyze_temporal_patterns(audio_data, sr=22050, resolution=TEMPORAL_RESOLUTION):
+    """
+    Decompose the energy envelope into trend, periodic and residual parts.
+    
+    The envelope is downsampled to a fixed resolution first, so the cost does
+    not grow with track length beyond a single pass over the samples.
     
+    Args:
+        audio_data (np.ndarray): Mono audio signal
+        sr (int): Sample rate
+        resolution (int): Maximum number of envelope points to decompose
+        
+    Returns:
+        dict: trend, seasonal and residual series plus the estimated period
+    """
+    rms_energy = _energy_envelope(audio_data)
+    envelope, frames_per_point = _downsample_envelope(rms_energy, resolution)
+    if len(envelope) == 0:
+        return {'trend': envelope, 'seasonal': envelope, 'residual': envelope,
+                'period': 0, 'period_seconds': 0.0}
+    
+    # Period is estimated on the detrended envelope so slow loudness
+    # changes do not dominate the autocorrelation
+    coarse_trend = _moving_average(envelope, max(3, len(envelope) // 4))
+    period = _estimate_period(envelope - coarse_trend)
+    
+    if period:
+        trend = _moving_average(envelope, period)
+        detrended = envelope - trend
+        phase = np.arange(len(envelope)) % period
+        profile = np.bincount(phase, weights=detrended, minlength=period)
+        profile /= np.maximum(np.bincount(phase, minlength=period), 1)
+        profile -= profile.mean()
+        seasonal = profile[phase]
+    else:
+        trend = _moving_average(envelope, max(3, len(envelope) // 8))
+        seasonal = np.zeros_like(envelope)
+    
+    seconds_per_point = frames_per_point * ENVELOPE_HOP / sr
     return {
-        'trend': decomposition.trend,
-        'seasonal': decomposition.seasonal,
-        'residual': decomposition.resid
+        'trend': trend,
+        'seasonal': seasonal,
+        'residual': envelope - trend - seasonal,
+        'period': period,
+        'period_seconds': period * seconds_per_point
     }
 
 def analyze_rhythm_strength(audio_data):
@@ -221,27 +403,60 @@ def analyze_rhythm_strength(audio_data):
         'beat_positions': librosa.beat.beat_track(onset_envelope=onset_env)[1]
     }
 
-def analyze_melodic_content(audio_data, sr=22050):
-    """Analyze melodic characteristics"""
-    # Extract pitch content
-    pitches, magnitudes = librosa.piptrack(y=audio_data, sr=sr)
-    
-    # Calculate pitch statistics
-    pitch_mean = np.mean(pitches[magnitudes > np.median(magnitudes)])
-    pitch_std = np.std(pitches[magnitudes > np.median(magnitudes)])
+MELODY_SR = 8000        # Decimated rate; Nyquist stays above MELODY_FMAX
+MELODY_FMIN = 65.0      # C2
+MELODY_FMAX = 2093.0    # C7
+MELODY_FRAME_RATE = 50  # Contour frames per second
+
+def analyze_melodic_content(audio_data, sr=22050, frame_rate=MELODY_FRAME_RATE):
+    """
+    Analyze melodic characteristics on a decimated, band-limited signal.
     
-    # Extract melody contour
-    melody = librosa.feature.melodia(
-        y=audio_data,
-        sr=sr,
-        hop_length=128
+    Args:
+        audio_data (np.ndarray): Mono audio signal
+        sr (int): Sample rate of audio_data
+        frame_rate (float): Frames per second of the melody contour
+        
+    Returns:
+        dict: Pitch statistics and the melody contour (Hz, 0 = unvoiced)
+    """
+    # Decimate: resampling low-passes the signal, and piptrack only looks
+    # between MELODY_FMIN and MELODY_FMAX
+    y = librosa.resample(audio_data, orig_sr=sr, target_sr=MELODY_SR)
+    hop_length = max(1, int(round(MELODY_SR / frame_rate)))
+    pitches, magnitudes = librosa.piptrack(
+        y=y,
+        sr=MELODY_SR,
+        n_fft=1024,
+        hop_length=hop_length,
+        fmin=MELODY_FMIN,
+        fmax=MELODY_FMAX
     )
+    del y
+    
+    # Single mask shared by every statistic
+    mask = magnitudes > np.median(magnitudes)
+    voiced_pitches = pitches[mask]
+    
+    # Melody contour: strongest masked peak in each frame
+    masked_magnitudes = np.where(mask, magnitudes, 0)
+    strongest = masked_magnitudes.argmax(axis=0)
+    melody = pitches[strongest, np.arange(pitches.shape[1])]
+    melody[~mask.any(axis=0)] = 0
+    
+    if voiced_pitches.size == 0:
+        return {
+            'pitch_mean': 0.0,
+            'pitch_variability': 0.0,
+            'melody_contour': melody.astype(np.float32),
+            'pitch_range': 0.0
+        }
     
     return {
-        'pitch_mean': pitch_mean,
-        'pitch_variability': pitch_std,
-        'melody_contour': melody,
-        'pitch_range': np.ptp(pitches[magnitudes > 0])
+        'pitch_mean': float(np.mean(voiced_pitches)),
+        'pitch_variability': float(np.std(voiced_pitches)),
+        'melody_contour': melody.astype(np.float32),
+        'pitch_range': float(np.ptp(voiced_pitches))
     }
 
 def analyze_structural_segments(audio_data, sr=22050):
@@ -1,12 +1,17 @@
 import dash
 from dash import dcc, html
 from dash.dependencies import Input, Output
-import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import json
+from functools import lru_cache
 from pathlib import Path
 import dash_bootstrap_components as dbc
+from feature_stats import FeatureStatistics, FEATURE_STATS_PATH
+from lazy_imports import lazy_import
+
+# plotly.express is only needed once the first figure is built
+px = lazy_import('plotly.express')
 
 # Initialize the Dash app with a modern theme
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
@@ -45,16 +50,33 @@ FEATURE_DESCRIPTIONS = {
     """
 }
 
-def load_data():
-    """Load analysis results from JSON file"""
+RESULTS_PATH = Path('results') / 'analysis_results.json'
+
+def data_version() -> tuple:
+    """Modification time and size of the result files; changes when they are rewritten."""
+    version = []
+    for path in (RESULTS_PATH, FEATURE_STATS_PATH):
+        try:
+            stat = path.stat()
+            version.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            version.append(None)
+    return tuple(version)
+
+@lru_cache(maxsize=1)
+def _load_data(version: tuple) -> pd.DataFrame:
     try:
-        with open(Path('results') / 'analysis_results.json', 'r') as f:
+        with open(RESULTS_PATH, 'r') as f:
             data = json.load(f)
         return pd.DataFrame(data)
     except Exception as e:
         print(f"Error loading data: {e}")
         return pd.DataFrame()
 
+def load_data(version: tuple = None) -> pd.DataFrame:
+    """Load analysis results from JSON file (parsed once per data version)"""
+    return _load_data(version or data_version())
+
 def create_info_card(title, description):
     """Create an info card with a title and description"""
     return dbc.Card([
@@ -64,130 +86,146 @@ def create_info_card(title, description):
         ])
     ], className="mb-3")
 
-# Layout
-app.layout = dbc.Container([
-    dbc.Row([
-        dbc.Col([
-            html.H1("Panel de Análisis de Audio de YouTube", className="text-center mb-4"),
-            html.P("Visualización interactiva de características de audio de videos de YouTube", className="text-center text-muted"),
-            dbc.Button(
-                "¿Qué significan estas métricas?",
-                id="open-help",
-                color="info",
-                className="mb-4"
-            ),
-            dbc.Modal([
-                dbc.ModalHeader("Entendiendo las Características del Audio"),
-                dbc.ModalBody([
-                    html.H5("Características de Audio Explicadas"),
-                    html.Hr(),
-                    *[create_info_card(feature.replace('_', ' ').title(), desc) 
-                      for feature, desc in FEATURE_DESCRIPTIONS.items()]
-                ]),
-                dbc.ModalFooter(
-                    dbc.Button("Cerrar", id="close-help", className="ml-auto")
+def serve_layout():
+    """
+    Page layout, built on every page load.
+    
+    Figures that do not depend on any control are embedded here from the
+    per-version cache, so they cost nothing after the first load of a
+    data version and are never rebuilt by callbacks.
+    """
+    version = data_version()
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col([
+                html.H1("Panel de Análisis de Audio de YouTube", className="text-center mb-4"),
+                html.P("Visualización interactiva de características de audio de videos de YouTube", className="text-center text-muted"),
+                dbc.Button(
+                    "¿Qué significan estas métricas?",
+                    id="open-help",
+                    color="info",
+                    className="mb-4"
                 ),
-            ], id="help-modal", size="lg", scrollable=True)
-        ])
-    ]),
+                dbc.Modal([
+                    dbc.ModalHeader("Entendiendo las Características del Audio"),
+                    dbc.ModalBody([
+                        html.H5("Características de Audio Explicadas"),
+                        html.Hr(),
+                        *[create_info_card(feature.replace('_', ' ').title(), desc) 
+                          for feature, desc in FEATURE_DESCRIPTIONS.items()]
+                    ]),
+                    dbc.ModalFooter(
+                        dbc.Button("Cerrar", id="close-help", className="ml-auto")
+                    ),
+                ], id="help-modal", size="lg", scrollable=True)
+            ])
+        ]),
     
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader([
-                    "Resumen de Características de Audio",
-                    html.I(className="fas fa-info-circle ml-2", id="correlation-info")
-                ]),
-                dbc.CardBody([
-                    html.P("""
-                        Este mapa de calor muestra cómo se relacionan las diferentes características de audio entre sí y con el número de vistas.
-                        El rojo indica correlaciones positivas (las características aumentan juntas),
-                        el azul indica correlaciones negativas (cuando una aumenta, la otra disminuye).
-                        Cuanto más oscuro el color, más fuerte es la relación.
-                    """, className="text-muted mb-3"),
-                    dcc.Graph(id='feature-correlation')
-                ])
-            ], className="mb-4")
-        ])
-    ]),
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader([
+                        "Resumen de Características de Audio",
+                        html.I(className="fas fa-info-circle ml-2", id="correlation-info")
+                    ]),
+                    dbc.CardBody([
+                        html.P("""
+                            Este mapa de calor muestra cómo se relacionan las diferentes características de audio entre sí y con el número de vistas.
+                            El rojo indica correlaciones positivas (las características aumentan juntas),
+                            el azul indica correlaciones negativas (cuando una aumenta, la otra disminuye).
+                            Cuanto más oscuro el color, más fuerte es la relación.
+                        """, className="text-muted mb-3"),
+                        dcc.Graph(id='feature-correlation', figure=correlation_figure(version))
+                    ])
+                ], className="mb-4")
+            ])
+        ]),
     
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader("Tempo vs Vistas"),
-                dbc.CardBody([
-                    html.P("""
-                        Este gráfico de dispersión muestra la relación entre el tempo de un video (velocidad de la música)
-                        y su número de vistas. Cada punto representa un video.
-                    """, className="text-muted mb-3"),
-                    dcc.Graph(id='tempo-views-scatter')
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("Tempo vs Vistas"),
+                    dbc.CardBody([
+                        html.P("""
+                            Este gráfico de dispersión muestra la relación entre el tempo de un video (velocidad de la música)
+                            y su número de vistas. Cada punto representa un video.
+                        """, className="text-muted mb-3"),
+                        dcc.Graph(id='tempo-views-scatter', figure=tempo_views_figure(version))
+                    ])
                 ])
-            ])
-        ], width=6),
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader("Distribución de Características"),
-                dbc.CardBody([
-                    html.P("""
-                        Este histograma muestra con qué frecuencia ocurren diferentes valores de cada característica.
-                        Usa el menú desplegable para explorar diferentes características de audio.
-                    """, className="text-muted mb-3"),
-                    dcc.Dropdown(
-                        id='feature-selector',
-                        options=[
-                            {'label': 'Tempo (BPM)', 'value': 'tempo'},
-                            {'label': 'Centroide Espectral (Brillo del Sonido)', 'value': 'spectral_centroid_mean'},
-                            {'label': 'Tasa de Cruce por Cero (Textura del Sonido)', 'value': 'zcr_mean'},
-                            {'label': 'Duración (segundos)', 'value': 'duration'}
-                        ],
-                        value='tempo',
-                        className="mb-3"
-                    ),
-                    dcc.Graph(id='feature-distribution')
+            ], width=6),
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("Distribución de Características"),
+                    dbc.CardBody([
+                        html.P("""
+                            Este histograma muestra con qué frecuencia ocurren diferentes valores de cada característica.
+                            Usa el menú desplegable para explorar diferentes características de audio.
+                        """, className="text-muted mb-3"),
+                        dcc.Dropdown(
+                            id='feature-selector',
+                            options=[
+                                {'label': 'Tempo (BPM)', 'value': 'tempo'},
+                                {'label': 'Centroide Espectral (Brillo del Sonido)', 'value': 'spectral_centroid_mean'},
+                                {'label': 'Tasa de Cruce por Cero (Textura del Sonido)', 'value': 'zcr_mean'},
+                                {'label': 'Duración (segundos)', 'value': 'duration'}
+                            ],
+                            value='tempo',
+                            className="mb-3"
+                        ),
+                        dcc.Graph(id='feature-distribution')
+                    ])
                 ])
-            ])
-        ], width=6)
-    ]),
+            ], width=6)
+        ]),
     
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader("Patrones MFCC"),
-                dbc.CardBody([
-                    html.P("""
-                        Este mapa de calor muestra los Coeficientes Cepstrales en las Frecuencias de Mel (MFCCs) para cada video.
-                        Patrones similares (colores) indican características sonoras similares.
-                        Cada fila representa un video, y cada columna representa un aspecto diferente del timbre del sonido.
-                    """, className="text-muted mb-3"),
-                    dcc.Graph(id='mfcc-heatmap')
-                ])
-            ], className="mt-4")
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader("Patrones MFCC"),
+                    dbc.CardBody([
+                        html.P("""
+                            Este mapa de calor muestra los Coeficientes Cepstrales en las Frecuencias de Mel (MFCCs) para cada video.
+                            Patrones similares (colores) indican características sonoras similares.
+                            Cada fila representa un video, y cada columna representa un aspecto diferente del timbre del sonido.
+                        """, className="text-muted mb-3"),
+                        dcc.Graph(id='mfcc-heatmap', figure=mfcc_figure(version))
+                    ])
+                ], className="mt-4")
+            ])
         ])
-    ])
-], fluid=True, className="p-4")
+    ], fluid=True, className="p-4")
 
-@app.callback(
+app.layout = serve_layout
+
+# The help modal only flips a property, so it runs in the browser
+app.clientside_callback(
+    """
+    function(n1, n2, is_open) {
+        if (n1 || n2) {
+            return !is_open;
+        }
+        return is_open;
+    }
+    """,
     Output("help-modal", "is_open"),
     [Input("open-help", "n_clicks"), Input("close-help", "n_clicks")],
     [dash.State("help-modal", "is_open")],
 )
-def toggle_modal(n1, n2, is_open):
-    if n1 or n2:
-        return not is_open
-    return is_open
 
-@app.callback(
-    Output('feature-correlation', 'figure'),
-    Input('feature-selector', 'value')
-)
-def update_correlation_plot(_):
-    df = load_data()
-    if df.empty:
-        return go.Figure()
-    
-    # Extract numeric features
+@lru_cache(maxsize=1)
+def correlation_figure(version: tuple):
     numeric_features = ['tempo', 'spectral_centroid_mean', 'zcr_mean', 'duration', 'views']
-    correlation_data = df[numeric_features].corr()
+    
+    # Use the statistics saved with the results instead of rescanning them
+    feature_stats = FeatureStatistics.load()
+    if feature_stats is not None and feature_stats.count > 1:
+        correlation_data = feature_stats.correlation(numeric_features)
+    else:
+        df = load_data(version)
+        if df.empty:
+            return go.Figure()
+        correlation_data = df[numeric_features].corr()
     
     # Make feature names more readable in Spanish
     feature_labels = {
@@ -214,12 +252,9 @@ def update_correlation_plot(_):
     )
     return fig
 
-@app.callback(
-    Output('tempo-views-scatter', 'figure'),
-    Input('feature-selector', 'value')
-)
-def update_tempo_views_scatter(_):
-    df = load_data()
+@lru_cache(maxsize=1)
+def tempo_views_figure(version: tuple):
+    df = load_data(version)
     if df.empty:
         return go.Figure()
     
@@ -243,12 +278,9 @@ def update_tempo_views_scatter(_):
     
     return fig
 
-@app.callback(
-    Output('feature-distribution', 'figure'),
-    Input('feature-selector', 'value')
-)
-def update_feature_distribution(feature):
-    df = load_data()
+@lru_cache(maxsize=8)
+def distribution_figure(version: tuple, feature: str):
+    df = load_data(version)
     if df.empty:
         return go.Figure()
     
@@ -276,12 +308,9 @@ def update_feature_distribution(feature):
     
     return fig
 
-@app.callback(
-    Output('mfcc-heatmap', 'figure'),
-    Input('feature-selector', 'value')
-)
-def update_mfcc_heatmap(_):
-    df = load_data()
+@lru_cache(maxsize=1)
+def mfcc_figure(version: tuple):
+    df = load_data(version)
     if df.empty:
         return go.Figure()
     
@@ -304,5 +333,14 @@ def update_mfcc_heatmap(_):
     
     return fig
 
+# Only the distribution depends on the selector; the other figures are
+# part of the layout (see serve_layout)
+@app.callback(
+    Output('feature-distribution', 'figure'),
+    Input('feature-selector', 'value')
+)
+def update_feature_distribution(feature):
+    return distribution_figure(data_version(), feature)
+
 if __name__ == '__main__':
     app.run_server(debug=True) 
\ No newline at end of file
@@ -1,8 +1,11 @@
+app.layout = create_advanced_layout
+
 @app.callback(
     Output('content-div', 'children'),
-    Input('tabs', 'value')
+    Input('tabs', 'value'),
+    Input('video-selector', 'value')
 )
-def update_content(tab):
-    if tab == 'analysis':
-        return create_analysis_tab(current_analysis_results)
+def update_content(tab, video_id):
+    if tab == 'analysis' and video_id:
+        return create_analysis_tab(video_id)
     # ... other tab handling ... 
\ No newline at end of file
@@ -2,6 +2,67 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 
+MAX_POINTS_PER_SERIES = 2000
+
+def downsample_series(values, max_points=MAX_POINTS_PER_SERIES):
+    """
+    Reduce a series to at most max_points while keeping its shape.
+    
+    The series is split into max_points // 2 buckets and the minimum and
+    maximum of each bucket are kept in time order, so peaks and the
+    envelope survive (unlike plain striding).
+    
+    Returns:
+        tuple: (frame indices, values) as NumPy arrays
+    """
+    y = np.asarray(values, dtype=float).ravel()
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n), y
+    
+    bucket_size = int(np.ceil(n / (max_points // 2)))
+    n_buckets = int(np.ceil(n / bucket_size))
+    padding = n_buckets * bucket_size - n
+    nan = np.isnan(y)
+    high = np.pad(np.where(nan, -np.inf, y), (0, padding), constant_values=-np.inf)
+    low = np.pad(np.where(nan, np.inf, y), (0, padding), constant_values=np.inf)
+    
+    offsets = np.arange(n_buckets) * bucket_size
+    i_max = high.reshape(n_buckets, bucket_size).argmax(axis=1) + offsets
+    i_min = low.reshape(n_buckets, bucket_size).argmin(axis=1) + offsets
+    indices = np.stack([np.minimum(i_min, i_max), np.maximum(i_min, i_max)], axis=1).ravel()
+    indices = indices[np.r_[True, indices[1:] != indices[:-1]]]
+    return indices, y[indices]
+
+def segment_outline(segment_details):
+    """
+    Outline of all segments as one polygon path (None-separated), so they
+    can be drawn as a single filled trace instead of one shape each.
+    """
+    x, y = [], []
+    for segment in segment_details:
+        x.extend([segment['start_time'], segment['start_time'], segment['end_time'], segment['end_time'], None])
+        y.extend([0, 1, 1, 0, None])
+    return x, y
+
+def box_statistics(values):
+    """Precomputed box plot statistics (Tukey fences) of a series."""
+    y = np.asarray(values, dtype=float).ravel()
+    y = y[~np.isnan(y)]
+    if len(y) == 0:
+        return {}
+    q1, median, q3 = np.percentile(y, [25, 50, 75])
+    iqr = q3 - q1
+    inside = y[(y >= q1 - 1.5 * iqr) & (y <= q3 + 1.5 * iqr)]
+    return {
+        'q1': [float(q1)],
+        'median': [float(median)],
+        'q3': [float(q3)],
+        'lowerfence': [float(inside.min())],
+        'upperfence': [float(inside.max())],
+        'mean': [float(y.mean())]
+    }
+
 def create_advanced_analysis_figures(analysis_results):
     # Create subplot figure
     fig = make_subplots(
@@ -15,9 +76,11 @@ def create_advanced_analysis_figures(analysis_results):
     
     # 1. Rhythm Analysis
     rhythm_data = analysis_results['rhythm']
+    x, y = downsample_series(rhythm_data['pulse'])
     fig.add_trace(
         go.Scatter(
-            y=rhythm_data['pulse'],
+            x=x,
+            y=y,
             name='Rhythm Pulse',
             line=dict(color='blue')
         ),
@@ -26,9 +89,11 @@ def create_advanced_analysis_figures(analysis_results):
     
     # 2. Melodic Content
     melody_data = analysis_results['melodic']
+    x, y = downsample_series(melody_data['melody_contour'])
     fig.add_trace(
         go.Scatter(
-            y=melody_data['melody_contour'],
+            x=x,
+            y=y,
             name='Melody Contour',
             line=dict(color='red')
         ),
@@ -37,9 +102,11 @@ def create_advanced_analysis_figures(analysis_results):
     
     # 3. Temporal Patterns
     temporal_data = analysis_results['temporal']
+    x, y = downsample_series(temporal_data['trend'])
     fig.add_trace(
         go.Scatter(
-            y=temporal_data['trend'],
+            x=x,
+            y=y,
             name='Trend',
             line=dict(color='green')
         ),
@@ -48,20 +115,26 @@ def create_advanced_analysis_figures(analysis_results):
     
     # 4. Structural Segments
     segments = analysis_results['segments']
-    for segment in segments['segment_details']:
-        fig.add_vrect(
-            x0=segment['start_time'],
-            x1=segment['end_time'],
+    x, y = segment_outline(segments['segment_details'])
+    fig.add_trace(
+        go.Scatter(
+            x=x,
+            y=y,
+            fill='toself',
             fillcolor="rgba(0,0,255,0.2)",
-            layer="below",
+            mode='lines',
             line_width=0,
-            row=2, col=2
-        )
+            hoverinfo='skip',
+            name='Segments'
+        ),
+        row=2, col=2
+    )
+    fig.update_yaxes(showticklabels=False, range=[0, 1], row=2, col=2)
     
     # 5. Feature Distribution
     fig.add_trace(
         go.Box(
-            y=analysis_results['features']['spectral_centroid'],
+            **box_statistics(analysis_results['features']['spectral_centroid']),
             name='Spectral Centroid'
         ),
         row=3, col=1
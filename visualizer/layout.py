@@ -1,8 +1,32 @@
 from dash import html, dcc
 import dash_bootstrap_components as dbc
+from analysis_store import load_analysis, list_analyses
 from .components.advanced_analysis import create_advanced_analysis_figures, create_summary_stats
 
-def create_analysis_tab(analysis_results):
+def create_video_selector():
+    """Dropdown of every video with a stored advanced analysis."""
+    video_ids = list_analyses()
+    return dcc.Dropdown(
+        id='video-selector',
+        options=[{'label': video_id, 'value': video_id} for video_id in video_ids],
+        value=video_ids[0] if video_ids else None,
+        placeholder="Select a video",
+        className="mb-3"
+    )
+
+def create_advanced_layout():
+    """Tabs, video selector and content area; called on every page load so new analyses appear."""
+    return dbc.Container([
+        dcc.Tabs(id='tabs', value='analysis', children=[
+            dcc.Tab(label='Advanced Analysis', value='analysis')
+        ]),
+        create_video_selector(),
+        html.Div(id='content-div')
+    ], fluid=True)
+
+def create_analysis_tab(video_id):
+    # Frame-level series are memory-mapped, so only the selected video is read
+    analysis_results = load_analysis(video_id)
     summary_stats = create_summary_stats(analysis_results)
     
     return dbc.Container([